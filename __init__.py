@@ -1,5 +0,0 @@
-from .core. import ValueStreamMap
-
-__all__ = [
-    'ValueStreamMap'
-]
\ No newline at end of file
@@ -0,0 +1,88 @@
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from vsm.cli import main
+
+MODEL = {
+    "processes": [
+        {"name": "Source", "process_time": 1, "time_variability": 0, "quality": 1, "nomenclature": {"Brut": 1}},
+        {"name": "M1", "process_time": 0.9, "time_variability": 0.3, "quality": 1,
+         "nomenclature": {"Brut": -1, "Fini": 1}},
+        {"name": "Stock"},
+    ],
+    "links": [["Source", "M1"], ["M1", "Stock"]],
+}
+
+
+class TestCli(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.model = os.path.join(self.tmp.name, "model.json")
+        with open(self.model, "w", encoding="utf-8") as f:
+            json.dump(MODEL, f)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def call(self, *argv):
+        out = io.StringIO()
+        with redirect_stdout(out):
+            code = main(list(argv))
+        return code, out.getvalue()
+
+    def test_run(self):
+        code, out = self.call("run", self.model, "--until", "100", "--seed", "1")
+        self.assertEqual(code, 0)
+        results = json.loads(out)
+        self.assertIn("Fini", results["throughput"])
+        self.assertEqual(results["stations"]["Source"]["crafts"], 101)
+
+    def test_run_to_precision(self):
+        code, out = self.call("run", self.model, "--until", "100000", "--seed", "1",
+                              "--precision", "0.02", "--interval", "5")
+        self.assertEqual(code, 0)
+        results = json.loads(out)
+        self.assertTrue(results["steady_state"]["converged"])
+        self.assertLess(results["time"], 100000)
+
+    def test_unfinished_precision_is_valid_json(self):
+        # Arrêt avant le premier contrôle MSER : pas d'estimation, mais un JSON strict.
+        code, out = self.call("run", self.model, "--until", "50", "--precision", "0.01", "--interval", "5")
+        self.assertEqual(code, 0)
+        results = json.loads(out, parse_constant=lambda name: self.fail(f"{name} dans la sortie JSON"))
+        self.assertIsNone(results["steady_state"]["mean"])
+        self.assertIsNone(results["steady_state"]["half_width"])
+        self.assertFalse(results["steady_state"]["converged"])
+
+    def test_render_dot(self):
+        code, out = self.call("render", self.model)
+        self.assertEqual(code, 0)
+        self.assertIn('"Source" -> "M1";', out)
+
+    def test_sweep(self):
+        code, out = self.call("sweep", self.model, "--scale", "0.8:1.0:3", "--station", "M1", "--top", "1")
+        self.assertEqual(code, 0)
+        rows = json.loads(out)
+        self.assertEqual(len(rows), 1)
+        self.assertAlmostEqual(rows[0]["scale"], 0.8)
+
+    def test_errors_are_reported(self):
+        code, _ = self.call("sweep", self.model, "--scale", "1:1:1", "--station", "Inconnue")
+        self.assertEqual(code, 1)
+        code, _ = self.call("sweep", self.model, "--scale", "1:1:1", "--station", "Inconnue", "--simulate")
+        self.assertEqual(code, 1)
+
+    def test_startup_is_lazy(self):
+        script = "import sys, vsm.cli, vsm; vsm.ValueStreamMap; print(sorted({'numpy', 'graphviz', 'vsm.core.simulation'} & set(sys.modules)))"
+        out = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True,
+                             cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        self.assertEqual(out.stdout.strip(), "[]")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from vsm.infra.event_log import Event, EventLogReader, EventLogMetrics, compute_metrics, follow_file
+
+CSV_LOG = """timestamp,event,process,product,quantity,unit,from,to
+0,transfer,,Produit_0,1,U1,,Process1
+0,start,Process1,Produit_0,1,U1,,
+4,stop,Process1,Produit_0,1,U1,,
+4,transfer,,Produit_0,1,U1,Process1,Process2
+5,transfer,,Produit_0,1,U2,,Process1
+5,start,Process1,Produit_0,1,U2,,
+9,stop,Process1,Produit_0,1,U2,,
+10,transfer,,Produit_0,1,U1,Process2,
+not-a-time,start,Process1,,,,,
+"""
+
+
+class TestEventLog(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.csv_path = os.path.join(self.tmp.name, "export.csv")
+        with open(self.csv_path, "w", encoding="utf-8") as f:
+            f.write(CSV_LOG)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_chunks_are_bounded(self):
+        reader = EventLogReader(chunk_size=3)
+        chunks = list(reader.iter_chunks(self.csv_path))
+        self.assertTrue(all(len(chunk) <= 3 for chunk in chunks))
+        self.assertEqual(sum(len(chunk) for chunk in chunks), 8)
+        self.assertEqual(reader.rejected, 1)
+
+    def test_metrics(self):
+        metrics = compute_metrics(self.csv_path, chunk_size=2, wip_resolution=5)
+        station = metrics.stations["Process1"]
+        self.assertEqual(station.processing_time.count, 2)
+        self.assertAlmostEqual(station.processing_time.mean, 4.0)
+        self.assertAlmostEqual(station.cycle_time.mean, 5.0)
+        self.assertEqual(metrics.lead_time.count, 1)
+        self.assertAlmostEqual(metrics.lead_time.mean, 10.0)
+        # WIP du flux : 1 unité sur [0, 5[, 2 sur [5, 10[, puis 1 après la sortie de U1
+        self.assertEqual(metrics.wip_curve(), [(0, 1.0), (5, 2.0), (10, 1.0)])
+
+    def test_start_stop_log_is_capped(self):
+        metrics = EventLogMetrics(max_open_units=10)
+        for unit in range(1000):
+            metrics.update([Event(unit * 2.0, "start", "M1", "P", 1, f"U{unit}"),
+                            Event(unit * 2.0 + 1, "stop", "M1", "P", 1, f"U{unit}")])
+        snapshot = metrics.snapshot()
+        self.assertEqual((snapshot["open_units"], snapshot["expired_units"]), (10, 990))
+        self.assertEqual(snapshot["open_starts"], 0)
+        self.assertEqual(metrics.stations["M1"].completed, 1000)
+
+    def test_unmatched_starts_are_capped(self):
+        # Starts sans stop (rebuts) : la file des starts ouverts reste bornée.
+        metrics = EventLogMetrics(max_open_units=10)
+        metrics.update(Event(float(time), "start", "M1", "P", 1, None) for time in range(50))
+        metrics.update([Event(100.0, "stop", "M1", "P", 1, None)])
+        snapshot = metrics.snapshot()
+        self.assertEqual((snapshot["open_starts"], snapshot["expired_starts"]), (9, 40))
+        self.assertEqual(metrics.stations["M1"].processing_time.mean, 60.0)
+
+    def test_units_already_in_line_keep_their_entry(self):
+        # Chaque unité passe 8 u.t. dans la ligne ; la première sortie arrive alors que U1 est en cours.
+        events = []
+        for unit in range(4):
+            t = 4.0 * unit
+            events += [Event(t, "start", "A", "P", 1, f"U{unit}"),
+                       Event(t + 4, "stop", "A", "P", 1, f"U{unit}"),
+                       Event(t + 4, "start", "B", "P", 1, f"U{unit}"),
+                       Event(t + 8, "stop", "B", "P", 1, f"U{unit}"),
+                       Event(t + 8, "transfer", None, "P", 1, f"U{unit}", "B", None)]
+        metrics = EventLogMetrics().consume([sorted(events, key=lambda event: event.time)])
+        self.assertEqual(metrics.lead_time.to_dict(), {"count": 4, "mean": 8.0, "std": 0.0, "min": 8.0, "max": 8.0})
+
+    def test_open_units_are_capped(self):
+        metrics = EventLogMetrics(max_open_units=10)
+        metrics.update([Event(0.0, "transfer", None, "P", 1, "U0", "M1", None)])
+        metrics.update(Event(float(unit), "transfer", None, "P", 1, f"U{unit}", None, "M1") for unit in range(1, 50))
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot["open_units"], 10)
+        self.assertEqual(snapshot["expired_units"], 39)
+
+    def test_jsonl_matches_csv(self):
+        jsonl_path = os.path.join(self.tmp.name, "export.jsonl")
+        with open(jsonl_path, "w", encoding="utf-8") as f:
+            for event in EventLogReader().iter_events(self.csv_path):
+                record = {"timestamp": event.time, "event": event.kind, "process": event.process,
+                          "product": event.product, "quantity": event.quantity, "unit": event.unit,
+                          "from": event.source, "to": event.target}
+                f.write(json.dumps(record) + "\n")
+        self.assertEqual(compute_metrics(jsonl_path).snapshot(), compute_metrics(self.csv_path).snapshot())
+
+    def test_tail_follows_growing_file(self):
+        path = os.path.join(self.tmp.name, "live.jsonl")
+        open(path, "w").close()
+
+        async def scenario():
+            stop = asyncio.Event()
+            metrics = EventLogMetrics()
+            task = asyncio.create_task(follow_file(path, metrics, poll_interval=0.01, stop=stop))
+            with open(path, "a", encoding="utf-8") as f:
+                f.write('{"timestamp": 0, "event": "start", "process": "P"}\n{"timestamp": 3, "ev')
+                f.flush()
+                await asyncio.sleep(0.05)
+                f.write('ent": "stop", "process": "P"}\n')
+                f.flush()
+                await asyncio.sleep(0.05)
+            stop.set()
+            await task
+            return metrics
+
+        metrics = asyncio.run(scenario())
+        self.assertEqual(metrics.events, 2)
+        self.assertAlmostEqual(metrics.stations["P"].processing_time.mean, 3.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
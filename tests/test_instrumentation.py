@@ -0,0 +1,69 @@
+import json
+import unittest
+from vsm.core.factory_process import Facory_Process
+from vsm.core.product_mangement import Produit
+from vsm.core.vsm import vsm
+from vsm.core.simulation import Simulation
+from vsm.core.instrumentation import Instrumentation
+
+
+def build_line():
+    """Source -> M1 -> M2, M2 étant le goulot."""
+    a, b, c = Produit(), Produit(), Produit()
+    line = vsm()
+    source = Facory_Process(name="Source", process_time=1, time_variability=0, quality=1)
+    source.set_nomenclature_produit(a, 1)
+    m1 = Facory_Process(name="M1", process_time=0.5, time_variability=0, quality=1)
+    m1.set_nomenclature_produit(a, -1)
+    m1.set_nomenclature_produit(b, 1)
+    m2 = Facory_Process(name="M2", process_time=2, time_variability=0, quality=1)
+    m2.set_nomenclature_produit(b, -1)
+    m2.set_nomenclature_produit(c, 1)
+    for process in (source, m1, m2):
+        line.add_process(process)
+    line.link_processes(source, m1)
+    line.link_processes(m1, m2)
+    return line
+
+
+class TestInstrumentation(unittest.TestCase):
+    def test_disabled_installs_nothing(self):
+        line = build_line()
+        sim = Simulation(line, seed=0)
+        sim.run(100)
+        self.assertTrue(all(process.stats is None for process in line.process_list))
+        self.assertEqual(sim.instrumentation.snapshot()["processes"], {})
+
+    def test_unseeded_run_drops_previous_seed(self):
+        line = build_line()
+        Simulation(line, seed=1).run(10)
+        Simulation(line)
+        self.assertTrue(all(process.rng is None for process in line.process_list))
+
+    def test_counters(self):
+        line = build_line()
+        instrumentation = Instrumentation("counters")
+        results = Simulation(line, seed=0, instrumentation=instrumentation).run(100)
+        snapshot = instrumentation.snapshot()
+        m1 = snapshot["processes"]["M1"]
+        self.assertEqual(m1["crafts"], results["stations"]["M1"]["crafts"])
+        # M1 attend la source la moitié du temps.
+        self.assertAlmostEqual(m1["starved_time"], 50, delta=1)
+        self.assertGreater(snapshot["loop"]["events"], 0)
+        self.assertEqual(instrumentation.hot_spots("starved_time", top=1)[0][0], "M1")
+        self.assertEqual(json.loads(instrumentation.to_json()), snapshot)
+
+    def test_sampled_timing(self):
+        line = build_line()
+        instrumentation = Instrumentation("sampled", sample_every=1)
+        Simulation(line, seed=0, instrumentation=instrumentation).run(100)
+        self.assertGreater(instrumentation.snapshot()["processes"]["M2"]["craft_cpu_time"], 0)
+        self.assertIn("M2", instrumentation.report())
+
+    def test_invalid_mode(self):
+        with self.assertRaises(ValueError):
+            Instrumentation("verbose")
+
+
+if __name__ == '__main__':
+    unittest.main()
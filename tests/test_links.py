@@ -0,0 +1,200 @@
+import json
+import os
+import tempfile
+import unittest
+from vsm.core.factory_process import Facory_Process
+from vsm.core.instrumentation import Instrumentation
+from vsm.core.link import Link, RingBuffer
+from vsm.core.process import Process
+from vsm.core.product_mangement import Produit
+from vsm.core.simulation import Simulation
+from vsm.core.vsm import vsm
+from vsm.infra.model_file import load_model
+
+
+def build_line(**link):
+    """Source (1 u.t.) -> M1 (2 u.t.) -> Stock ; `link` paramètre la liaison Source -> M1."""
+    brut, fini = Produit(), Produit()
+    line = vsm()
+    source = Facory_Process(name="Source", process_time=1, time_variability=0, quality=1)
+    source.set_nomenclature_produit(brut, 1)
+    m1 = Facory_Process(name="M1", process_time=2, time_variability=0, quality=1)
+    m1.set_nomenclature_produit(brut, -1)
+    m1.set_nomenclature_produit(fini, 1)
+    stock = Process(name="Stock")
+    for process in (source, m1, stock):
+        line.add_process(process)
+    line.link_processes(source, m1, **link)
+    line.link_processes(m1, stock)
+    return line, source, m1, stock, brut, fini
+
+
+class TestRingBuffer(unittest.TestCase):
+    def test_fifo_with_wraparound_and_growth(self):
+        ring = RingBuffer(2)
+        ring.push(1.0, 10)
+        ring.push(2.0, 20)
+        self.assertEqual(ring.pop(), 10)
+        ring.push(3.0, 30)    # retour au début du tableau
+        ring.push(4.0, 40)    # file pleine : doublement
+        self.assertEqual(len(ring), 3)
+        self.assertEqual(ring.peek_time(), 2.0)
+        self.assertEqual([ring.pop() for _ in range(3)], [20, 30, 40])
+        self.assertFalse(ring)
+        with self.assertRaises(IndexError):
+            ring.pop()
+
+
+class TestLink(unittest.TestCase):
+    def test_link_unpacks_like_a_tuple(self):
+        line, source, m1, _, _, _ = build_line(capacity=3, transfer_batch=3, transport_time=1.5)
+        parent, child = line.links[0]
+        self.assertIs(parent, source)
+        self.assertIs(child, m1)
+        self.assertIn('"Source" -> "M1" [label="cap 3, lot 3, t 1.5"];', line.get_dot())
+        self.assertIn('"M1" -> "Stock";', line.get_dot())
+
+    def test_invalid_links(self):
+        a, b = Process("A"), Process("B")
+        for options in ({"capacity": 0}, {"transfer_batch": 0}, {"capacity": 2, "transfer_batch": 3},
+                        {"transport_time": -1}):
+            with self.assertRaises(ValueError):
+                Link(a, b, **options)
+
+
+class TestBoundedSimulation(unittest.TestCase):
+    def test_unbounded_wip_grows(self):
+        line, _, m1, _, brut, _ = build_line()
+        Simulation(line).run(1000)
+        self.assertGreater(m1.get_quantity(brut), 400)
+
+    def test_capacity_blocks_upstream(self):
+        line, source, m1, stock, brut, fini = build_line(capacity=5)
+        simulation = Simulation(line, instrumentation=Instrumentation("counters"))
+        simulation.run(1000)
+        self.assertLessEqual(m1.get_quantity(brut), 5)
+        self.assertLessEqual(simulation.wip(), 7)
+        # M1 reste le goulot : le débit ne change pas, la source passe la moitié du temps bloquée.
+        self.assertEqual(stock.get_quantity(fini), 499)
+        self.assertAlmostEqual(source.stats.blocked_time, 494, delta=5)
+
+    def test_capacity_below_consumption_is_rejected(self):
+        # M1 consomme 3 unités par craft : une capacité de 2 ne le laisserait jamais démarrer.
+        brut = Produit()
+        line = vsm()
+        source = Facory_Process(name="Source", process_time=1, time_variability=0, quality=1)
+        source.set_nomenclature_produit(brut, 1)
+        m1 = Facory_Process(name="M1", process_time=1, time_variability=0, quality=1)
+        m1.set_nomenclature_produit(brut, -3)
+        m1.set_nomenclature_produit(Produit(), 1)
+        line.add_process(source)
+        line.add_process(m1)
+        line.link_processes(source, m1, capacity=2)
+        with self.assertRaises(ValueError):
+            Simulation(line)
+        line.links[0] = Link(source, m1, capacity=3)
+        results = Simulation(line).run(10)
+        self.assertEqual(results["stations"]["M1"]["crafts"], 3)
+
+    def test_capacity_towards_storage_is_ignored(self):
+        # Le stockage ne consomme jamais : une capacité sur M1 -> Stock ne doit pas bloquer M1.
+        line, source, m1, stock, brut, fini = build_line()
+        line.links[1] = Link(m1, stock, capacity=10)
+        simulation = Simulation(line, instrumentation=Instrumentation("counters"))
+        simulation.run(1000)
+        self.assertEqual(stock.get_quantity(fini), 499)
+        self.assertEqual(m1.stats.blocked_time, 0)
+
+    def test_transfer_batch(self):
+        line, _, m1, _, brut, _ = build_line(transfer_batch=4)
+        simulation = Simulation(line)
+        simulation.run(3.5)
+        self.assertEqual(m1.get_quantity(brut), 0)
+        simulation.run(4)
+        self.assertEqual(simulation.results()["stations"]["M1"]["crafts"], 1)
+        self.assertEqual(m1.get_quantity(brut), 3)
+
+    def test_transport_time(self):
+        line, _, m1, _, brut, _ = build_line(transport_time=2.5)
+        simulation = Simulation(line)
+        simulation.run(3)
+        self.assertEqual(simulation.results()["stations"]["M1"]["crafts"], 0)
+        self.assertEqual(simulation.wip(), 4)    # 3 en transport + 1 en cours de fabrication
+        simulation.run(3.5)
+        self.assertEqual(simulation.results()["stations"]["M1"]["crafts"], 1)
+
+    def test_blocking_propagates_up_a_long_line(self):
+        products = [Produit() for _ in range(200)]
+        line = vsm()
+        stations = []
+        for i, produit in enumerate(products):
+            station = Facory_Process(name=f"S{i}", process_time=2 if i == len(products) - 1 else 1,
+                                     time_variability=0, quality=1)
+            if stations:
+                station.set_nomenclature_produit(products[i - 1], -1)
+            station.set_nomenclature_produit(produit, 1)
+            line.add_process(station)
+            if stations:
+                line.link_processes(stations[-1], station, capacity=1)
+            stations.append(station)
+        simulation = Simulation(line, instrumentation=Instrumentation("counters"))
+        results = simulation.run(1000)
+        for i in range(1, len(stations)):
+            self.assertLessEqual(stations[i].get_quantity(products[i - 1]), 1)
+        # La source finit par suivre la cadence du goulot (1 craft / 2 u.t.).
+        crafts = results["stations"]["S0"]["crafts"]
+        self.assertEqual(simulation.run(1200)["stations"]["S0"]["crafts"] - crafts, 100)
+        self.assertGreater(stations[0].stats.blocked_time, 200)
+
+    def test_conwip_limits_loop_wip(self):
+        brut, semi, fini = Produit(), Produit(), Produit()
+        line = vsm()
+        source = Facory_Process(name="Source", process_time=1, time_variability=0, quality=1)
+        source.set_nomenclature_produit(brut, 1)
+        m1 = Facory_Process(name="M1", process_time=0.5, time_variability=0, quality=1)
+        m1.set_nomenclature_produit(brut, -1)
+        m1.set_nomenclature_produit(semi, 1)
+        m2 = Facory_Process(name="M2", process_time=3, time_variability=0, quality=1)
+        m2.set_nomenclature_produit(semi, -1)
+        m2.set_nomenclature_produit(fini, 1)
+        stock = Process(name="Stock")
+        for process in (source, m1, m2, stock):
+            line.add_process(process)
+        line.link_processes(source, m1)
+        line.link_processes(m1, m2)
+        line.link_processes(m2, stock)
+        line.add_conwip_loop([m1, m2], 3)
+        simulation = Simulation(line)
+        for t in range(1, 301):
+            simulation.run(t)
+            self.assertLessEqual(m1.get_quantity(semi) + m2.get_quantity(semi) + m2.get_quantity(fini), 3)
+        self.assertEqual(stock.get_quantity(fini), 99)
+        # La matière première attend hors de la boucle.
+        self.assertGreater(m1.get_quantity(brut), 150)
+
+
+class TestModelFile(unittest.TestCase):
+    def test_link_options_and_conwip(self):
+        data = {
+            "processes": [
+                {"name": "Source", "process_time": 1, "nomenclature": {"A": 1}},
+                {"name": "M1", "process_time": 2, "nomenclature": {"A": -1, "B": 1}},
+                {"name": "Stock"},
+            ],
+            "links": [{"from": "Source", "to": "M1", "capacity": 4, "transfer_batch": 2, "transport_time": 1},
+                      ["M1", "Stock"]],
+            "conwip": [{"processes": ["M1"], "limit": 2}],
+        }
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "model.json")
+            with open(path, "w", encoding="utf-8") as stream:
+                json.dump(data, stream)
+            model, _ = load_model(path)
+        link = model.links[0]
+        self.assertEqual((link.capacity, link.transfer_batch, link.transport_time), (4, 2, 1))
+        self.assertTrue(model.links[1].plain)
+        self.assertEqual(model.conwip_loops[0].limit, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
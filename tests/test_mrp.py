@@ -0,0 +1,107 @@
+import unittest
+import numpy as np
+from vsm.core.factory_process import Facory_Process
+from vsm.core.product_mangement import Produit
+from vsm.core.vsm import vsm
+from vsm.analysis.mrp import BillOfMaterials
+
+
+class TestBillOfMaterials(unittest.TestCase):
+    def setUp(self):
+        # Vélo = Cadre + 2 Roues ; Roue = Jante + 32 Rayons ; Cadre = 3 Tubes (2 cadres par craft)
+        self.velo, self.cadre, self.roue = Produit(), Produit(), Produit()
+        self.jante, self.rayon, self.tube = Produit(), Produit(), Produit()
+        self.map = vsm()
+        self.assemblage = Facory_Process(name="Assemblage", process_time=1, time_variability=0, quality=1)
+        self.assemblage.set_nomenclature_produit(self.cadre, -1)
+        self.assemblage.set_nomenclature_produit(self.roue, -2)
+        self.assemblage.set_nomenclature_produit(self.velo, 1)
+        self.rayonnage = Facory_Process(name="Rayonnage", process_time=1, time_variability=0, quality=1)
+        self.rayonnage.set_nomenclature_produit(self.jante, -1)
+        self.rayonnage.set_nomenclature_produit(self.rayon, -32)
+        self.rayonnage.set_nomenclature_produit(self.roue, 1)
+        self.soudure = Facory_Process(name="Soudure", process_time=1, time_variability=0, quality=1)
+        self.soudure.set_nomenclature_produit(self.tube, -3)
+        self.soudure.set_nomenclature_produit(self.cadre, 2)
+        for process in (self.soudure, self.rayonnage, self.assemblage):
+            self.map.add_process(process)
+        self.bom = BillOfMaterials(self.map)
+
+    def test_explosion(self):
+        explosion = self.bom.explosion(self.velo)
+        self.assertEqual(explosion[self.roue], 2)
+        self.assertEqual(explosion[self.rayon], 64)
+        self.assertEqual(explosion[self.tube], 1.5)
+        self.assertEqual(self.bom.explode({self.velo: 10})[self.jante], 20)
+
+    def test_net_requirements_use_inventory(self):
+        self.rayonnage.add(self.roue, 5)
+        self.soudure.add(self.tube, 4)
+        result = self.bom.requirements({self.velo: 10})
+        self.assertEqual(result["gross"][self.roue], 20)
+        self.assertEqual(result["net"][self.roue], 15)
+        self.assertEqual(result["net"][self.rayon], 15 * 32)
+        # 10 cadres -> 5 crafts de soudure -> 15 tubes, dont 4 en stock
+        self.assertEqual(result["crafts"]["Soudure"], 5)
+        self.assertEqual(result["net"][self.tube], 11)
+
+    def test_many_scenarios(self):
+        demands = [{self.velo: n} for n in (0, 1, 3, 10)]
+        result = self.bom.requirements_many(demands)
+        for row, demand in enumerate(demands):
+            self.assertEqual(result.scenario(row), self.bom.requirements(demand))
+        column = result.products.index(self.velo)
+        array = np.zeros((2, len(result.products)))
+        array[:, column] = (1, 3)
+        np.testing.assert_array_equal(self.bom.requirements_many(array).net, result.net[1:3])
+
+    def test_memoization_and_invalidation(self):
+        self.bom.explosion(self.velo)
+        misses = self.bom.misses
+        self.bom.explosion(self.velo)
+        self.assertEqual(self.bom.misses, misses)
+        # Seule la branche roue est recalculée.
+        self.rayonnage.remove_nomenclature_produit(self.rayon)
+        self.rayonnage.set_nomenclature_produit(self.rayon, -36)
+        self.assertEqual(self.bom.explosion(self.velo)[self.rayon], 72)
+        self.assertEqual(self.bom.misses, misses + 2)
+        self.assertEqual(self.bom.explosion(self.cadre)[self.tube], 1.5)
+        self.assertEqual(self.bom.misses, misses + 2)
+
+    def test_diamond_is_not_a_cycle(self):
+        # A = C + B et B = 2 C : C est atteint par deux branches.
+        a, b, c = Produit(), Produit(), Produit()
+        bom_map = vsm()
+        make_a = Facory_Process(name="A", process_time=1, time_variability=0, quality=1)
+        make_a.set_nomenclature_produit(c, -1)
+        make_a.set_nomenclature_produit(b, -1)
+        make_a.set_nomenclature_produit(a, 1)
+        make_b = Facory_Process(name="B", process_time=1, time_variability=0, quality=1)
+        make_b.set_nomenclature_produit(c, -2)
+        make_b.set_nomenclature_produit(b, 1)
+        bom_map.add_process(make_a)
+        bom_map.add_process(make_b)
+        bom = BillOfMaterials(bom_map)
+        self.assertEqual(bom.explosion(a), {c: 3.0, b: 1.0})
+        self.assertEqual(bom.requirements({a: 2})["gross"][c], 6)
+
+    def test_co_products_share_crafts(self):
+        c, d = Produit(), Produit()
+        self.soudure.set_nomenclature_produit(c, 1)
+        self.soudure.set_nomenclature_produit(d, 1)
+        result = self.bom.requirements({c: 1, d: 1})
+        self.assertEqual(result["crafts"]["Soudure"], 1)
+        self.assertEqual(result["gross"][self.tube], 3)
+        result = self.bom.requirements({self.velo: 4, d: 1})
+        # 4 cadres -> 2 crafts, qui fournissent aussi 2 D.
+        self.assertEqual(result["crafts"]["Soudure"], 2)
+        self.assertEqual(result["gross"][self.tube], 6)
+
+    def test_cycle_is_rejected(self):
+        self.soudure.set_nomenclature_produit(self.velo, -1)
+        with self.assertRaises(ValueError):
+            self.bom.explosion(self.velo)
+
+
+if __name__ == '__main__':
+    unittest.main()
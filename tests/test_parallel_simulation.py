@@ -0,0 +1,117 @@
+import unittest
+from vsm.core.factory_process import Facory_Process
+from vsm.core.process import Process
+from vsm.core.product_mangement import Produit
+from vsm.core.vsm import vsm
+from vsm.core.link import Link
+from vsm.core.simulation import Simulation
+from vsm.core.parallel_simulation import ParallelSimulation, partition_vsm
+
+
+def build_plant(variability=0.3):
+    """Deux lignes (S1 -> M1, S2 -> M2) qui alimentent un assemblage puis un stock."""
+    a, b, c, d, e = Produit(), Produit(), Produit(), Produit(), Produit()
+    plant = vsm()
+    s1 = Facory_Process(name="S1", process_time=1, time_variability=variability, quality=1)
+    s1.set_nomenclature_produit(a, 1)
+    m1 = Facory_Process(name="M1", process_time=0.8, time_variability=variability, quality=1)
+    m1.set_nomenclature_produit(a, -1)
+    m1.set_nomenclature_produit(b, 1)
+    s2 = Facory_Process(name="S2", process_time=1.1, time_variability=variability, quality=1)
+    s2.set_nomenclature_produit(c, 2)
+    m2 = Facory_Process(name="M2", process_time=0.5, time_variability=variability, quality=1)
+    m2.set_nomenclature_produit(c, -1)
+    m2.set_nomenclature_produit(d, 1)
+    assembly = Facory_Process(name="ASM", process_time=1.2, time_variability=variability, quality=1)
+    assembly.set_nomenclature_produit(b, -1)
+    assembly.set_nomenclature_produit(d, -2)
+    assembly.set_nomenclature_produit(e, 1)
+    stock = Process(name="Stock")
+    for process in (s1, m1, s2, m2, assembly, stock):
+        plant.add_process(process)
+    plant.link_processes(s1, m1)
+    plant.link_processes(s2, m2)
+    plant.link_processes(m1, assembly)
+    plant.link_processes(m2, assembly)
+    plant.link_processes(assembly, stock)
+    return plant
+
+
+def names(result):
+    # Les identifiants de produits dépendent du nombre de Produit déjà créés.
+    result = dict(result)
+    result["throughput"] = sorted(result["throughput"].values())
+    return result
+
+
+class TestParallelSimulation(unittest.TestCase):
+    def test_partition_by_cells(self):
+        plant = build_plant()
+        cells = {"S1": "ligne1", "M1": "ligne1", "S2": "ligne2", "M2": "ligne2", "ASM": "final", "Stock": "final"}
+        partitions = partition_vsm(plant, cells=cells)
+        self.assertEqual([[process.get_name() for process in part] for part in partitions],
+                         [["S1", "M1"], ["S2", "M2"], ["ASM", "Stock"]])
+
+    def test_loops_are_merged(self):
+        plant = build_plant()
+        processes = {process.get_name(): process for process in plant.process_list}
+        plant.link_processes(processes["ASM"], processes["M1"])
+        partitions = partition_vsm(plant, n_partitions=6)
+        merged = [part for part in partitions if processes["ASM"] in part][0]
+        self.assertIn(processes["M1"], merged)
+
+    def test_matches_serial_engine(self):
+        for variability in (0.3, 0):
+            serial = Simulation(build_plant(variability), seed=7).run(500)
+            for backend in ("inline", "process"):
+                parallel = ParallelSimulation(build_plant(variability), seed=7, workers=3,
+                                              window=10, backend=backend).run(500)
+                self.assertEqual(names(parallel), names(serial))
+
+    def test_inventories_are_written_back(self):
+        serial_plant, parallel_plant = build_plant(), build_plant()
+        Simulation(serial_plant, seed=1).run(100)
+        ParallelSimulation(parallel_plant, seed=1, workers=3).run(100)
+        for serial_process, parallel_process in zip(serial_plant.process_list, parallel_plant.process_list):
+            self.assertEqual(sorted(serial_process.get_products().values()),
+                             sorted(parallel_process.get_products().values()))
+
+    def test_bounded_links_stay_in_one_partition(self):
+        plant = build_plant()
+        processes = {process.get_name(): process for process in plant.process_list}
+        plant.links[2] = Link(processes["M1"], processes["ASM"], capacity=4)
+        cells = {"S1": "ligne1", "M1": "ligne1", "S2": "ligne2", "M2": "ligne2", "ASM": "final", "Stock": "final"}
+        partitions = partition_vsm(plant, cells=cells)
+        self.assertEqual([[process.get_name() for process in part] for part in partitions],
+                         [["S2", "M2"], ["S1", "M1", "ASM", "Stock"]])
+        with self.assertRaises(ValueError):
+            ParallelSimulation(plant, partitions=[[processes["S1"], processes["M1"]],
+                                                  [processes["S2"], processes["M2"]],
+                                                  [processes["ASM"], processes["Stock"]]])
+
+    def test_transport_between_partitions(self):
+        def build():
+            plant = build_plant()
+            plant.links[:] = [Link(parent, child, transport_time=1.5, transfer_batch=2 if child.get_name() == "ASM" else 1)
+                              for parent, child in plant.links]
+            return plant
+        serial = Simulation(build(), seed=3).run(300)
+        parallel = ParallelSimulation(build(), seed=3, workers=3, window=10, backend="inline").run(300)
+        self.assertEqual(names(parallel), names(serial))
+
+    def test_worker_errors_are_raised(self):
+        plant = build_plant()
+        processes = {process.get_name(): process for process in plant.process_list}
+        processes["S2"].process_time = 0
+        for backend in ("inline", "process"):
+            with self.assertRaises(ValueError):
+                ParallelSimulation(plant, workers=3, backend=backend).run(100)
+
+    def test_partitions_must_cover_vsm(self):
+        plant = build_plant()
+        with self.assertRaises(ValueError):
+            ParallelSimulation(plant, partitions=[plant.process_list[:2]])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+import numpy as np
+from vsm.core.factory_process import Facory_Process
+from vsm.core.process import Process
+from vsm.core.product_mangement import Produit
+from vsm.core.vsm import vsm
+from vsm.analysis.queueing import QueueingNetwork, solve_vsm
+
+
+def build_line(times=(1.0, 0.9, 0.9), variability=0.45):
+    """Source déterministe suivie de stations en série, puis d'un stock."""
+    products = [Produit() for _ in times]
+    line = vsm()
+    previous = None
+    for i, process_time in enumerate(times):
+        process = Facory_Process(name=f"P{i}", process_time=process_time,
+                                 time_variability=variability if i else 0.0, quality=1)
+        if i:
+            process.set_nomenclature_produit(products[i - 1], -1)
+        process.set_nomenclature_produit(products[i], 1)
+        line.add_process(process)
+        if previous is not None:
+            line.link_processes(previous, process)
+        previous = process
+    stock = Process(name="Stock")
+    line.add_process(stock)
+    line.link_processes(previous, stock)
+    return line
+
+
+class TestQueueing(unittest.TestCase):
+    def test_kingman_line(self):
+        result = solve_vsm(build_line())
+        p1, p2 = result["stations"]["P1"], result["stations"]["P2"]
+        self.assertAlmostEqual(p1["utilization"], 0.9)
+        # ca² = 0 (source déterministe), ce² = 0.25 : Wq = 0.125 * 9 * 0.9
+        self.assertAlmostEqual(p1["waiting_time"], 1.0125)
+        self.assertAlmostEqual(p1["cd2"], 0.81 * 0.25)
+        self.assertAlmostEqual(p2["ca2"], p1["cd2"])
+        self.assertAlmostEqual(result["lead_time"], 1.0 + p1["cycle_time"] + p2["cycle_time"])
+        self.assertEqual(list(result["throughput"].values()), [1.0])
+
+    def test_bottleneck_saturates(self):
+        result = solve_vsm(build_line(times=(1.0, 2.0, 0.5)))
+        self.assertEqual(result["stations"]["P1"]["waiting_time"], float("inf"))
+        self.assertAlmostEqual(result["stations"]["P2"]["throughput"], 0.5)
+        self.assertAlmostEqual(list(result["throughput"].values())[0], 0.5)
+
+    def test_assembly_waits_for_scarcest_input(self):
+        a, b, c = Produit(), Produit(), Produit()
+        plant = vsm()
+        s1 = Facory_Process(name="S1", process_time=1, time_variability=0, quality=1)
+        s1.set_nomenclature_produit(a, 1)
+        s2 = Facory_Process(name="S2", process_time=1, time_variability=0, quality=1)
+        s2.set_nomenclature_produit(b, 1)
+        assembly = Facory_Process(name="ASM", process_time=1, time_variability=0, quality=1)
+        assembly.set_nomenclature_produit(a, -1)
+        assembly.set_nomenclature_produit(b, -2)
+        assembly.set_nomenclature_produit(c, 1)
+        for process in (s1, s2, assembly):
+            plant.add_process(process)
+        plant.link_processes(s1, assembly)
+        plant.link_processes(s2, assembly)
+        result = solve_vsm(plant)
+        self.assertAlmostEqual(result["stations"]["ASM"]["throughput"], 0.5)
+        self.assertAlmostEqual(result["throughput"][str(c)], 0.5)
+
+    def test_vectorized_matches_single(self):
+        network = QueueingNetwork(build_line())
+        scale = np.linspace(0.8, 1.05, 6)[:, None]
+        batch = network.solve(network.process_time * scale)
+        for row, factor in enumerate(scale[:, 0]):
+            single = network.solve(network.process_time * factor)
+            np.testing.assert_allclose(batch.waiting_time[row], single.waiting_time)
+            np.testing.assert_allclose(batch.lead_time[row], single.lead_time)
+        self.assertEqual(batch.rank("lead_time", top=1)[0], np.argmin(batch.lead_time))
+
+    def test_loop_is_rejected(self):
+        line = build_line()
+        p0, p1 = line.process_list[0], line.process_list[1]
+        p0.set_nomenclature_produit(list(p1.get_nomenclature())[1], -1)
+        line.link_processes(p1, p0)
+        with self.assertRaises(ValueError):
+            QueueingNetwork(line)
+
+
+if __name__ == '__main__':
+    unittest.main()
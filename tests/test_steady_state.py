@@ -0,0 +1,149 @@
+import math
+import unittest
+import numpy as np
+from vsm.core.factory_process import Facory_Process
+from vsm.core.process import Process
+from vsm.core.product_mangement import Produit
+from vsm.core.simulation import Simulation
+from vsm.core.vsm import vsm
+from vsm.analysis.steady_state import (OutputSeries, batch_means_interval, mser, replicate,
+                                       run_to_precision, t_quantile)
+
+
+def build_line(backlog: int = 100) -> vsm:
+    """Source (1/u.t.) -> M1 (0.8 u.t.) -> Stock, avec un stock initial devant M1."""
+    brut, fini = Produit(), Produit()
+    line = vsm()
+    source = Facory_Process(name="Source", process_time=1, time_variability=0.3, quality=1)
+    source.set_nomenclature_produit(brut, 1)
+    m1 = Facory_Process(name="M1", process_time=0.8, time_variability=0.3, quality=1)
+    m1.set_nomenclature_produit(brut, -1)
+    m1.set_nomenclature_produit(fini, 1)
+    m1.add(brut, backlog)
+    stock = Process(name="Stock")
+    for process in (source, m1, stock):
+        line.add_process(process)
+    line.link_processes(source, m1)
+    line.link_processes(m1, stock)
+    return line
+
+
+def build_assembly(branches: int) -> vsm:
+    """`branches` branches Source (2 u.t.) -> M (1 u.t.) assemblées par ASM (1 u.t.) -> Stock, sans aléa."""
+    line = vsm()
+    fini = Produit()
+    asm = Facory_Process(name="ASM", process_time=1, time_variability=0, quality=1)
+    asm.set_nomenclature_produit(fini, 1)
+    stock = Process(name="Stock")
+    line.add_process(asm)
+    line.add_process(stock)
+    line.link_processes(asm, stock)
+    for branch in range(branches):
+        brut, piece = Produit(), Produit()
+        source = Facory_Process(name=f"Source{branch}", process_time=2, time_variability=0, quality=1)
+        source.set_nomenclature_produit(brut, 1)
+        machine = Facory_Process(name=f"M{branch}", process_time=1, time_variability=0, quality=1)
+        machine.set_nomenclature_produit(brut, -1)
+        machine.set_nomenclature_produit(piece, 1)
+        asm.set_nomenclature_produit(piece, -1)
+        line.add_process(source)
+        line.add_process(machine)
+        line.link_processes(source, machine)
+        line.link_processes(machine, asm)
+    return line
+
+
+class TestStatistics(unittest.TestCase):
+    def test_t_quantile(self):
+        self.assertAlmostEqual(t_quantile(0.975, 1), 12.706, places=3)
+        self.assertAlmostEqual(t_quantile(0.975, 2), 4.303, places=3)
+        self.assertAlmostEqual(t_quantile(0.975, 4), 2.776, delta=0.01)
+        self.assertAlmostEqual(t_quantile(0.975, 19), 2.093, places=3)
+
+    def test_mser_finds_transient(self):
+        rng = np.random.default_rng(0)
+        values = np.concatenate([np.linspace(10, 1, 50), np.ones(450)]) + rng.normal(0, 0.1, 500)
+        series = OutputSeries()
+        for value in values:
+            series.add(value)
+        cut, detected = series.truncation()
+        self.assertTrue(detected)
+        self.assertTrue(40 <= cut <= 60, cut)
+
+    def test_mser_needs_enough_data(self):
+        d, detected = mser(np.linspace(5, 1, 20))
+        self.assertFalse(detected)
+        self.assertEqual(d, 10)
+
+    def test_batch_means_interval(self):
+        values = np.random.default_rng(1).normal(3.0, 1.0, 4000)
+        mean, half = batch_means_interval(values, 0.95, 20)
+        self.assertLess(abs(mean - 3.0), half)
+        self.assertLess(half, 0.1)
+        with self.assertRaises(ValueError):
+            batch_means_interval(values[:10], 0.95, 20)
+
+
+class TestRunToPrecision(unittest.TestCase):
+    def test_throughput(self):
+        simulation = Simulation(build_line(), seed=1)
+        result = run_to_precision(simulation, "throughput", precision=0.01, interval=2)
+        self.assertTrue(result.converged)
+        self.assertLessEqual(result.relative_half_width, 0.01)
+        self.assertAlmostEqual(result.mean, 1.0, delta=0.02)
+        # Le stock initial est résorbé à 0,25 unité par u.t. : environ 400 u.t. de transitoire.
+        self.assertGreater(result.warmup, 200)
+        self.assertEqual(simulation.now, result.run_length)
+
+    def test_lead_time(self):
+        result = run_to_precision(Simulation(build_line(0), seed=2), "lead_time", precision=0.05, interval=2)
+        self.assertTrue(result.converged)
+        self.assertGreater(result.mean, 0.8)
+
+    def test_lead_time_of_assembly(self):
+        # Le lead time d'un assemblage est le plus long chemin (2 + 1 + 1), pas WIP total / débit
+        # qui compte chaque branche.
+        for branches in (1, 2, 4):
+            with self.subTest(branches=branches):
+                result = run_to_precision(Simulation(build_assembly(branches)), "lead_time", interval=2)
+                self.assertTrue(result.converged)
+                self.assertAlmostEqual(result.mean, 4.0, places=6)
+
+    def test_max_time(self):
+        result = run_to_precision(Simulation(build_line(), seed=1), precision=1e-6, interval=2, max_time=300)
+        self.assertFalse(result.converged)
+        self.assertEqual(result.run_length, 300)
+
+    def test_invalid_metric(self):
+        with self.assertRaises(ValueError):
+            run_to_precision(Simulation(build_line()), "wip")
+
+
+class TestReplicate(unittest.TestCase):
+    def test_stops_when_precise(self):
+        result = replicate(build_line, until=2000, interval=2, precision=0.01, max_replications=50)
+        self.assertTrue(result.converged)
+        self.assertLess(result.replications, 50)
+        self.assertAlmostEqual(result.mean, 1.0, delta=0.03)
+        self.assertGreater(result.warmup, 0)
+
+    def test_short_replications_are_not_converged(self):
+        result = replicate(build_line, until=800, interval=2, precision=0.5, max_replications=50)
+        self.assertFalse(result.converged)
+        self.assertEqual(result.replications, 5)
+
+    def test_lead_time_of_assembly(self):
+        result = replicate(lambda: build_assembly(2), until=200, metric="lead_time", interval=2)
+        self.assertTrue(result.converged)
+        self.assertAlmostEqual(result.mean, 4.0, places=6)
+
+    def test_max_replications(self):
+        result = replicate(lambda: build_line(0), until=200, interval=2, precision=1e-9,
+                           min_replications=2, max_replications=3)
+        self.assertFalse(result.converged)
+        self.assertEqual(result.replications, 3)
+        self.assertTrue(math.isfinite(result.half_width))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+"""
+Auto VSM : modélisation, simulation et analyse de Value Stream Maps.
+
+Les classes sont exportées à la demande (PEP 562) : `import vsm` ne charge ni numpy,
+ni graphviz, ni les modules de simulation ou d'analyse avant leur première utilisation.
+"""
+
+from importlib import import_module
+
+_EXPORTS = {
+    "ValueStreamMap": ("vsm.core.vsm", "vsm"),
+    "Process": ("vsm.core.process", "Process"),
+    "Link": ("vsm.core.link", "Link"),
+    "Facory_Process": ("vsm.core.factory_process", "Facory_Process"),
+    "Produit": ("vsm.core.product_mangement", "Produit"),
+    "Inventaire": ("vsm.core.inventory_management", "Inventaire"),
+    "Simulation": ("vsm.core.simulation", "Simulation"),
+    "ParallelSimulation": ("vsm.core.parallel_simulation", "ParallelSimulation"),
+    "Instrumentation": ("vsm.core.instrumentation", "Instrumentation"),
+    "QueueingNetwork": ("vsm.analysis.queueing", "QueueingNetwork"),
+    "BillOfMaterials": ("vsm.analysis.mrp", "BillOfMaterials"),
+    "run_to_precision": ("vsm.analysis.steady_state", "run_to_precision"),
+    "replicate": ("vsm.analysis.steady_state", "replicate"),
+    "load_vsm": ("vsm.infra.model_file", "load_vsm"),
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module 'vsm' has no attribute '{name}'")
+    module, attribute = _EXPORTS[name]
+    value = getattr(import_module(module), attribute)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
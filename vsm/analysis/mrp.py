@@ -0,0 +1,286 @@
+"""
+Module: mrp
+Description: Explosion multi-niveaux des nomenclatures de la VSM et calcul des besoins (MRP).
+             Chaque Facory_Process définit un niveau de nomenclature (entrées négatives,
+             sorties positives) ; un produit est fabriqué par le premier process de la VSM
+             qui le produit, et un produit que personne ne fabrique est une matière première.
+
+             Les recettes (un niveau) et les explosions (tous niveaux, par unité) sont
+             mémorisées par produit. Elles ne sont invalidées que pour les produits touchés par
+             un `set_nomenclature_produit` / `remove_nomenclature_produit`, détectés grâce à
+             `nomenclature_version` (une modification directe du dict `nomenclature` n'est pas vue).
+"""
+
+from typing import Optional, Union
+import numpy as np
+
+
+_RAW = object()   # recette mémorisée d'une matière première
+
+
+class MrpResult:
+    """
+    Besoins de plusieurs scénarios de demande.
+
+    Attributes:
+        products (list): produits, dans l'ordre des colonnes de `gross` et `net`.
+        stations (list): process fabricants, dans l'ordre des colonnes de `crafts`.
+        gross (np.ndarray): besoins bruts (scénarios, produits).
+        net (np.ndarray): besoins nets du stock (scénarios, produits).
+        crafts (np.ndarray): nombre de crafts à lancer (scénarios, stations).
+    """
+
+    def __init__(self, products: list, stations: list, gross: np.ndarray, net: np.ndarray, crafts: np.ndarray):
+        self.products = products
+        self.stations = stations
+        self.gross = gross
+        self.net = net
+        self.crafts = crafts
+
+    def scenario(self, index: int) -> dict:
+        """Besoins d'un scénario : {"gross": {produit: qte}, "net": {...}, "crafts": {nom: n}}."""
+        return {
+            "gross": {produit: float(qte) for produit, qte in zip(self.products, self.gross[index])},
+            "net": {produit: float(qte) for produit, qte in zip(self.products, self.net[index])},
+            "crafts": {station.get_name(): int(n) for station, n in zip(self.stations, self.crafts[index])},
+        }
+
+
+class BillOfMaterials:
+    """
+    Nomenclature multi-niveaux d'une VSM, avec cache par produit.
+
+    Args:
+        vsm_instance: VSM dont les Facory_Process définissent les nomenclatures.
+    """
+
+    def __init__(self, vsm_instance):
+        self.vsm = vsm_instance
+        self.hits = 0
+        self.misses = 0
+        self._versions: dict = {}       # process -> nomenclature_version déjà prise en compte
+        self._outputs: dict = {}        # process -> produits qu'il fabriquait alors
+        self._makers: dict = {}         # produit -> process fabricant
+        self._recipes: dict = {}        # produit -> (process, qte produite, {entrée: qte}) ou _RAW
+        self._explosions: dict = {}     # produit -> {composant: qte par unité}
+        self._dependents: dict = {}     # produit -> produits dont l'explosion utilise sa recette
+        self._order: Optional[list] = None
+
+    def _stations(self) -> list:
+        return [process for process in self.vsm.process_list if hasattr(process, "nomenclature")]
+
+    def _refresh(self) -> None:
+        """Invalide le cache des produits dont un process a modifié sa nomenclature."""
+        stations = self._stations()
+        current = set(stations)
+        changed = [process for process in stations
+                   if self._versions.get(process) != getattr(process, "nomenclature_version", 0)]
+        removed = [process for process in self._versions if process not in current]
+        if not changed and not removed:
+            return
+        affected = set()
+        for process in removed:
+            affected |= self._outputs.pop(process)
+            del self._versions[process]
+        for process in changed:
+            outputs = {produit for produit, qte in process.nomenclature.items() if qte > 0}
+            affected |= self._outputs.get(process, set()) | outputs
+            self._outputs[process] = outputs
+            self._versions[process] = getattr(process, "nomenclature_version", 0)
+        for produit in affected:
+            self._makers.pop(produit, None)
+            self._recipes.pop(produit, None)
+            for dependent in self._dependents.pop(produit, set()) | {produit}:
+                self._explosions.pop(dependent, None)
+        for process in stations:
+            for produit in self._outputs[process] & affected:
+                self._makers.setdefault(produit, process)
+        self._order = None
+
+    def recipe(self, produit):
+        """
+        Recette (un niveau) d'un produit.
+
+        Returns:
+            tuple | None: (process fabricant, quantité produite par craft, {entrée: quantité par craft}),
+                          None pour une matière première.
+        """
+        self._refresh()
+        return self._recipe(produit)
+
+    def _recipe(self, produit):
+        recipe = self._recipes.get(produit)
+        if recipe is None:
+            maker = self._makers.get(produit)
+            if maker is None:
+                recipe = _RAW
+            else:
+                inputs = {entree: -qte for entree, qte in maker.nomenclature.items() if qte < 0}
+                recipe = (maker, maker.nomenclature[produit], inputs)
+            self._recipes[produit] = recipe
+        return None if recipe is _RAW else recipe
+
+    def explosion(self, produit) -> dict:
+        """
+        Explosion tous niveaux d'une unité de `produit` (crafts fractionnaires, sans stock).
+
+        Returns:
+            dict: {composant: quantité} pour chaque composant, toutes profondeurs confondues.
+
+        Raises:
+            ValueError: si la nomenclature est cyclique.
+        """
+        self._refresh()
+        return dict(self._explode(produit))
+
+    def _explode(self, produit) -> dict:
+        cached = self._explosions.get(produit)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        # Parcours en profondeur itératif (les longues lignes dépasseraient la limite de récursion),
+        # avec entrée / sortie explicites : `visiting` ne contient que le chemin en cours, un
+        # composant partagé par deux branches (nomenclature en losange) n'est pas un cycle.
+        stack, visiting = [(produit, False)], set()
+        while stack:
+            current, leaving = stack.pop()
+            if leaving:
+                self._expand(current)
+                visiting.discard(current)
+                continue
+            if current in self._explosions:
+                continue
+            visiting.add(current)
+            stack.append((current, True))
+            recipe = self._recipe(current)
+            for entree in (recipe[2] if recipe is not None else ()):
+                if entree in visiting:
+                    raise ValueError(f"Nomenclature cyclique autour de {entree}.")
+                if entree not in self._explosions:
+                    stack.append((entree, False))
+        return self._explosions[produit]
+
+    def _expand(self, current) -> None:
+        # Explosion de `current`, ses entrées étant déjà explosées.
+        self.misses += 1
+        recipe = self._recipe(current)
+        total, used = {}, {current}
+        if recipe is not None:
+            _, produced, inputs = recipe
+            for entree, qte in inputs.items():
+                per_unit = qte / produced
+                total[entree] = total.get(entree, 0.0) + per_unit
+                for component, sub_qte in self._explosions[entree].items():
+                    total[component] = total.get(component, 0.0) + per_unit * sub_qte
+                used |= self._uses(entree)
+        self._explosions[current] = total
+        for component in used:
+            self._dependents.setdefault(component, set()).add(current)
+
+    def _uses(self, produit) -> set:
+        # Produits dont la recette intervient dans l'explosion de `produit`.
+        return {produit} | {component for component in self._explosions[produit]}
+
+    @property
+    def products(self) -> list:
+        """Produits de la VSM, chaque produit avant ses composants (ordre des colonnes de MrpResult)."""
+        self._refresh()
+        if self._order is None:
+            products = list(dict.fromkeys(produit for process in self._stations() for produit in process.nomenclature))
+            indegree = {produit: 0 for produit in products}
+            for produit in products:
+                recipe = self._recipe(produit)
+                for entree in (recipe[2] if recipe is not None else ()):
+                    indegree[entree] += 1
+            ready = [produit for produit in products if indegree[produit] == 0]
+            order = []
+            while ready:
+                produit = ready.pop()
+                order.append(produit)
+                recipe = self._recipe(produit)
+                for entree in (recipe[2] if recipe is not None else ()):
+                    indegree[entree] -= 1
+                    if indegree[entree] == 0:
+                        ready.append(entree)
+            if len(order) != len(products):
+                raise ValueError("Nomenclature cyclique : les besoins ne peuvent pas être calculés.")
+            self._order = order
+        return self._order
+
+    def explode(self, demand: dict) -> dict:
+        """
+        Besoins bruts tous niveaux d'une demande {produit: quantité}, sans tenir compte du stock.
+        Les co-produits d'un même craft y sont comptés séparément ; `requirements_many` les regroupe.
+        """
+        self._refresh()
+        total: dict = {}
+        for produit, qte in demand.items():
+            total[produit] = total.get(produit, 0.0) + qte
+            for component, per_unit in self._explode(produit).items():
+                total[component] = total.get(component, 0.0) + per_unit * qte
+        return total
+
+    def on_hand(self) -> dict:
+        """Stock courant de chaque produit, tous process de la VSM confondus."""
+        stock: dict = {}
+        for process in self.vsm.process_list:
+            for produit, qte in process.get_products().items():
+                stock[produit] = stock.get(produit, 0) + qte
+        return stock
+
+    def requirements_many(self, demands: Union[list, np.ndarray], on_hand: Optional[dict] = None) -> MrpResult:
+        """
+        Calcul MRP (brut -> net -> crafts, niveau par niveau) pour plusieurs scénarios à la fois.
+
+        Args:
+            demands (list | np.ndarray): liste de dicts {produit: quantité}, ou tableau
+                                         (scénarios, produits) dans l'ordre de `products`.
+            on_hand (Optional[dict]): stock disponible par produit ; par défaut les inventaires de la VSM.
+
+        Returns:
+            MrpResult: besoins bruts, nets et crafts par scénario. Les crafts sont entiers : une
+                       station qui produit n unités par craft en fabrique un multiple de n.
+        """
+        products = self.products
+        column = {produit: index for index, produit in enumerate(products)}
+        if isinstance(demands, np.ndarray):
+            demand = np.atleast_2d(np.asarray(demands, dtype=float))
+            if demand.shape[1] != len(products):
+                raise ValueError(f"{demand.shape[1]} colonnes de demande pour {len(products)} produits.")
+        else:
+            demand = np.zeros((len(demands), len(products)))
+            for row, scenario in enumerate(demands):
+                for produit, qte in scenario.items():
+                    if produit not in column:
+                        raise KeyError(f"Le produit {produit} n'apparaît dans aucune nomenclature.")
+                    demand[row, column[produit]] += qte
+        stock = self.on_hand() if on_hand is None else on_hand
+        available = np.array([stock.get(produit, 0) for produit in products], dtype=float)
+
+        makers = list(dict.fromkeys(recipe[0] for recipe in map(self._recipe, products) if recipe is not None))
+        station_column = {process: index for index, process in enumerate(makers)}
+        # Dernier produit de chaque fabricant dans l'ordre : ses entrées viennent après toutes ses sorties.
+        last_output = {self._recipe(produit)[0]: index for index, produit in enumerate(products)
+                       if self._recipe(produit) is not None}
+        gross = demand.copy()
+        net = np.zeros_like(demand)
+        crafts = np.zeros((demand.shape[0], len(makers)))
+        for index, produit in enumerate(products):
+            net[:, index] = np.maximum(gross[:, index] - available[index], 0.0)
+            recipe = self._recipe(produit)
+            if recipe is None:
+                continue
+            maker, produced, inputs = recipe
+            # Un craft fournit tous les co-produits : on retient le besoin le plus fort.
+            column_of_maker = station_column[maker]
+            np.maximum(crafts[:, column_of_maker], np.ceil(net[:, index] / produced - 1e-9),
+                       out=crafts[:, column_of_maker])
+            if last_output[maker] != index:
+                continue
+            for entree, qte in inputs.items():
+                gross[:, column[entree]] += crafts[:, column_of_maker] * qte
+        return MrpResult(products, makers, gross, net, crafts)
+
+    def requirements(self, demand: dict, on_hand: Optional[dict] = None) -> dict:
+        """Calcul MRP d'une demande {produit: quantité} (voir `requirements_many`)."""
+        return self.requirements_many([demand], on_hand).scenario(0)
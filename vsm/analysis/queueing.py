@@ -0,0 +1,316 @@
+"""
+Module: queueing
+Description: Estimation analytique (sans simulation) des performances d'une VSM vue comme
+             un réseau de files G/G/1 :
+               - taux de service 1/process_time et variabilité ce² = (time_variability / process_time)²,
+               - débit de chaque station limité par l'entrée la plus rare de sa nomenclature,
+               - attente de Kingman  Wq = (ca² + ce²) / 2 * u / (1 - u) * te,
+               - variabilité en sortie (Hopp & Spearman)  cd² = u² ce² + (1 - u²) ca²,
+               - superposition / séparation des flux (Whitt)  ca² = Σ (λk / λ) (pk cdk² + 1 - pk).
+             Les calculs sont propagés dans l'ordre topologique, niveau par niveau, et sont
+             vectorisés : plusieurs milliers de configurations (temps de process / variabilités)
+             sont évaluées en un seul appel.
+"""
+
+import math
+from typing import Optional
+import numpy as np
+
+
+class QueueingResult:
+    """
+    Résultats d'un `QueueingNetwork.solve`. Les tableaux sont de forme (configurations, stations),
+    ou (stations,) si une seule configuration a été évaluée.
+    """
+
+    def __init__(self, names: list[str], squeeze: bool, **arrays):
+        self.names = names
+        self._squeeze = squeeze
+        for key, value in arrays.items():
+            setattr(self, key, value[0] if squeeze and isinstance(value, np.ndarray) else value)
+        if squeeze:
+            self.product_throughput = {name: values[0] for name, values in self.product_throughput.items()}
+
+    def to_dict(self) -> dict:
+        """Résultats d'une configuration unique sous forme de dict."""
+        if not self._squeeze:
+            raise ValueError("to_dict n'est disponible que pour une configuration unique.")
+        return {
+            "lead_time": float(self.lead_time),
+            "throughput": {name: float(value) for name, value in self.product_throughput.items()},
+            "stations": {
+                name: {
+                    "throughput": float(self.throughput[i]),
+                    "utilization": float(self.utilization[i]),
+                    "waiting_time": float(self.waiting_time[i]),
+                    "cycle_time": float(self.cycle_time[i]),
+                    "lead_time": float(self.station_lead_time[i]),
+                    "ca2": float(self.ca2[i]),
+                    "cd2": float(self.cd2[i]),
+                }
+                for i, name in enumerate(self.names)
+            },
+        }
+
+    def rank(self, by: str = "lead_time", top: int = 10) -> np.ndarray:
+        """
+        Indices des meilleures configurations.
+
+        Args:
+            by (str): "lead_time" (croissant) ou le nom d'un produit fini (débit décroissant).
+            top (int): Nombre de configurations retournées.
+        """
+        if by == "lead_time":
+            score = np.atleast_1d(self.lead_time)
+        elif by in self.product_throughput:
+            score = -np.atleast_1d(self.product_throughput[by])
+        else:
+            raise KeyError(f"Critère inconnu : {by}.")
+        return np.argsort(score, kind="stable")[:top]
+
+
+class _Level:
+    """Stations d'un même niveau topologique et leurs alimentations, à plat pour les reduceat."""
+    __slots__ = ("stations", "slot_start", "slot_counts", "feed_start", "feed_source", "feed_factor", "feed_split")
+
+
+class QueueingNetwork:
+    """
+    Réseau de files compilé à partir d'une VSM.
+
+    Chaque process ayant un `process_time` est une station. Une station sans entrée dans sa
+    nomenclature est une source, qui produit en continu à sa cadence. Les autres process
+    (stockage) reçoivent les produits finis. Les produits partant vers plusieurs enfants
+    sont supposés répartis également.
+
+    Raises:
+        ValueError: si les stations forment une boucle.
+    """
+
+    def __init__(self, vsm_instance):
+        stations = [process for process in vsm_instance.process_list if hasattr(process, "process_time")]
+        position = {process: index for index, process in enumerate(stations)}
+        self.stations = stations
+        self.names = [process.get_name() for process in stations]
+        self.process_time = np.array([float(process.process_time) for process in stations])
+        self.time_variability = np.array([float(process.time_variability) for process in stations])
+        null = len(stations)   # alimentation fictive de débit nul
+
+        children: dict = {}
+        for parent, child in vsm_instance.links:
+            children.setdefault(parent, []).append(child)
+
+        # feeds[i] : [(produit, quantité consommée, [(source, kits par craft de la source, fraction du flux)])]
+        inputs = [{produit: -qte for produit, qte in process.nomenclature.items() if qte < 0} for process in stations]
+        feeds = [{produit: [] for produit in needed} for needed in inputs]
+        sinks: dict[str, list[tuple[int, float]]] = {}
+        for source, process in enumerate(stations):
+            for produit, qte in process.nomenclature.items():
+                if qte <= 0:
+                    continue
+                receivers = [child for child in children.get(process, [])
+                             if child not in position or inputs[position[child]].get(produit, 0) > 0]
+                passive = sum(1 for child in receivers if child not in position)
+                if not receivers or passive:
+                    share = 1.0 if not receivers else passive / len(receivers)
+                    sinks.setdefault(str(produit), []).append((source, qte * share))
+                for child in receivers:
+                    if child in position:
+                        target = position[child]
+                        feeds[target][produit].append((source, qte / len(receivers) / inputs[target][produit],
+                                                       1.0 / len(receivers)))
+
+        # Niveaux topologiques (plus long chemin depuis les sources).
+        level = [None] * len(stations)
+        successors: list[list[int]] = [[] for _ in stations]
+        indegree = [0] * len(stations)
+        for target, slots in enumerate(feeds):
+            for edges in slots.values():
+                for source, _, _ in edges:
+                    successors[source].append(target)
+                    indegree[target] += 1
+        ready = [index for index, degree in enumerate(indegree) if degree == 0]
+        for index in ready:
+            level[index] = 0 if not inputs[index] else 1
+        visited = 0
+        while ready:
+            index = ready.pop()
+            visited += 1
+            for target in successors[index]:
+                level[target] = max(level[target] or 0, level[index] + 1)
+                indegree[target] -= 1
+                if indegree[target] == 0:
+                    ready.append(target)
+        if visited != len(stations):
+            raise ValueError("Les stations de la VSM forment une boucle : le modèle analytique ne s'applique pas.")
+
+        self.sources = np.array([index for index in range(len(stations)) if not inputs[index]], dtype=int)
+        by_level: dict[int, list[int]] = {}
+        for index in range(len(stations)):
+            if inputs[index]:
+                by_level.setdefault(level[index], []).append(index)
+        # Ordre topologique et alimentations, pour le calcul scalaire d'une configuration unique.
+        self._order = [(index, [edges or [(null, 0.0, 1.0)] for edges in feeds[index].values()])
+                       for depth in sorted(by_level) for index in by_level[depth]]
+        self.levels: list[_Level] = []
+        for depth in sorted(by_level):
+            members = by_level[depth]
+            entry = _Level()
+            entry.stations = np.array(members, dtype=int)
+            slot_start, slot_counts, feed_start = [], [], []
+            feed_source, feed_factor, feed_split = [], [], []
+            for index in members:
+                slot_start.append(len(feed_start))
+                slot_counts.append(len(feeds[index]))
+                for edges in feeds[index].values():
+                    feed_start.append(len(feed_source))
+                    for source, factor, split in edges or [(null, 0.0, 1.0)]:
+                        feed_source.append(source)
+                        feed_factor.append(factor)
+                        feed_split.append(split)
+            entry.slot_start = np.array(slot_start, dtype=int)
+            entry.slot_counts = np.array(slot_counts, dtype=int)
+            entry.feed_start = np.array(feed_start, dtype=int)
+            entry.feed_source = np.array(feed_source, dtype=int)
+            entry.feed_factor = np.array(feed_factor)
+            entry.feed_split = np.array(feed_split)
+            self.levels.append(entry)
+        self.sinks = {name: (np.array([source for source, _ in entries], dtype=int),
+                             np.array([rate for _, rate in entries]))
+                      for name, entries in sinks.items()}
+        sink_stations = sorted({source for entries in sinks.values() for source, _ in entries})
+        self.sink_stations = np.array(sink_stations, dtype=int)
+
+    def solve(self, process_time: Optional[np.ndarray] = None,
+              time_variability: Optional[np.ndarray] = None) -> QueueingResult:
+        """
+        Évalue une ou plusieurs configurations.
+
+        Args:
+            process_time (Optional[np.ndarray]): (stations,) ou (configurations, stations), dans
+                                                 l'ordre de `names`. Par défaut les valeurs de la VSM.
+            time_variability (Optional[np.ndarray]): Idem pour les écarts-types.
+
+        Returns:
+            QueueingResult: débits, utilisations, attentes et lead times.
+        """
+        te = np.asarray(self.process_time if process_time is None else process_time, dtype=float)
+        sigma = np.asarray(self.time_variability if time_variability is None else time_variability, dtype=float)
+        squeeze = te.ndim == 1 and sigma.ndim == 1
+        te, sigma = np.broadcast_arrays(np.atleast_2d(te), np.atleast_2d(sigma))
+        configs, count = te.shape
+        if count != len(self.names):
+            raise ValueError(f"{count} temps de process fournis pour {len(self.names)} stations.")
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mu = np.where(te > 0, 1.0 / te, np.inf)
+            ce2 = np.where(te > 0, (sigma / te) ** 2, 0.0)
+            # Colonne supplémentaire : alimentation fictive de débit nul.
+            rate = np.zeros((configs, count + 1))
+            cd2 = np.ones((configs, count + 1))
+            lead = np.zeros((configs, count + 1))
+            ca2 = np.zeros((configs, count))
+            utilization = np.zeros((configs, count))
+            waiting = np.zeros((configs, count))
+
+            src = self.sources
+            rate[:, src] = mu[:, src]
+            utilization[:, src] = np.where(np.isfinite(mu[:, src]), 1.0, 0.0)
+            cd2[:, src] = ce2[:, src]
+            lead[:, src] = te[:, src]
+
+            propagate = self._propagate_scalar if configs == 1 else self._propagate_levels
+            propagate(te, mu, ce2, rate, cd2, lead, ca2, utilization, waiting)
+
+        product_throughput = {name: (rate[:, sources] * factors).sum(axis=1)
+                              for name, (sources, factors) in self.sinks.items()}
+        lead_time = (lead[:, self.sink_stations].max(axis=1) if len(self.sink_stations)
+                     else np.zeros(configs))
+        return QueueingResult(
+            self.names, squeeze,
+            throughput=rate[:, :count],
+            utilization=utilization,
+            waiting_time=waiting,
+            cycle_time=waiting + te,
+            station_lead_time=lead[:, :count],
+            ca2=ca2,
+            cd2=cd2[:, :count],
+            lead_time=lead_time,
+            product_throughput=product_throughput,
+        )
+
+    def _propagate_levels(self, te, mu, ce2, rate, cd2, lead, ca2, utilization, waiting) -> None:
+        """Propagation niveau par niveau, vectorisée sur les stations et les configurations."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for entry in self.levels:
+                members, feed_source = entry.stations, entry.feed_source
+                feed_rate = rate[:, feed_source] * entry.feed_factor
+                slot_rate = np.add.reduceat(feed_rate, entry.feed_start, axis=1)
+                feed_c2 = entry.feed_split * cd2[:, feed_source] + 1.0 - entry.feed_split
+                slot_ca2 = np.where(slot_rate > 0,
+                                    np.add.reduceat(feed_rate * feed_c2, entry.feed_start, axis=1) / slot_rate, 1.0)
+                arrival = np.minimum.reduceat(slot_rate, entry.slot_start, axis=1)
+                # La variabilité d'arrivée est celle de l'entrée limitante.
+                binding = slot_rate == np.repeat(arrival, entry.slot_counts, axis=1)
+                station_ca2 = (np.add.reduceat(binding * slot_ca2, entry.slot_start, axis=1)
+                               / np.add.reduceat(binding, entry.slot_start, axis=1))
+                input_lead = np.maximum.reduceat(np.maximum.reduceat(lead[:, feed_source], entry.feed_start, axis=1),
+                                                 entry.slot_start, axis=1)
+
+                station_te, station_ce2 = te[:, members], ce2[:, members]
+                u = np.where(np.isfinite(mu[:, members]), arrival * station_te, 0.0)
+                u_eff = np.minimum(u, 1.0)
+                wq = np.where(u >= 1.0, np.inf, (station_ca2 + station_ce2) / 2.0 * u / (1.0 - u) * station_te)
+                wq = np.where(u > 0, wq, 0.0)
+
+                rate[:, members] = np.minimum(arrival, mu[:, members])
+                cd2[:, members] = u_eff ** 2 * station_ce2 + (1.0 - u_eff ** 2) * station_ca2
+                lead[:, members] = input_lead + wq + station_te
+                ca2[:, members] = station_ca2
+                utilization[:, members] = u_eff
+                waiting[:, members] = wq
+
+    def _propagate_scalar(self, te, mu, ce2, rate, cd2, lead, ca2, utilization, waiting) -> None:
+        """
+        Même calcul pour une configuration unique, station par station : sur une VSM profonde
+        (longue ligne), le coût fixe des appels numpy par niveau dominerait.
+        """
+        te, mu, ce2 = te[0].tolist(), mu[0].tolist(), ce2[0].tolist()
+        rates, cd2s, leads = rate[0].tolist(), cd2[0].tolist(), lead[0].tolist()
+        ca2s, utilizations, waitings = ca2[0].tolist(), utilization[0].tolist(), waiting[0].tolist()
+        for index, slots in self._order:
+            arrival, binding, input_lead = math.inf, [], 0.0
+            for edges in slots:
+                slot_rate = weighted = slot_lead = 0.0
+                for source, factor, split in edges:
+                    feed_rate = rates[source] * factor
+                    slot_rate += feed_rate
+                    weighted += feed_rate * (split * cd2s[source] + 1.0 - split)
+                    slot_lead = max(slot_lead, leads[source])
+                slot_ca2 = weighted / slot_rate if slot_rate > 0 else 1.0
+                if slot_rate < arrival:
+                    arrival, binding = slot_rate, [slot_ca2]
+                elif slot_rate == arrival:
+                    binding.append(slot_ca2)
+                input_lead = max(input_lead, slot_lead)
+            station_ca2 = sum(binding) / len(binding)
+            station_te, station_ce2 = te[index], ce2[index]
+            u = arrival * station_te if math.isfinite(mu[index]) else 0.0
+            u_eff = min(u, 1.0)
+            if u <= 0:
+                wq = 0.0
+            elif u >= 1.0:
+                wq = math.inf
+            else:
+                wq = (station_ca2 + station_ce2) / 2.0 * u / (1.0 - u) * station_te
+            rates[index] = min(arrival, mu[index])
+            cd2s[index] = u_eff ** 2 * station_ce2 + (1.0 - u_eff ** 2) * station_ca2
+            leads[index] = input_lead + wq + station_te
+            ca2s[index], utilizations[index], waitings[index] = station_ca2, u_eff, wq
+        rate[0], cd2[0], lead[0] = rates, cd2s, leads
+        ca2[0], utilization[0], waiting[0] = ca2s, utilizations, waitings
+
+
+def solve_vsm(vsm_instance) -> dict:
+    """Estimation analytique d'une VSM avec ses paramètres courants."""
+    return QueueingNetwork(vsm_instance).solve().to_dict()
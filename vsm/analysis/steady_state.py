@@ -0,0 +1,450 @@
+"""
+Module: steady_state
+Description: Analyse en ligne des sorties de simulation : détection de la fin du régime
+             transitoire et arrêt dès qu'une précision cible est atteinte.
+
+             La simulation est observée par fenêtres de durée fixe : débit (produits finis par
+             unité de temps) et, pour le lead time, aires et sorties de chaque stock
+             (Simulation.track_flows). Le lead time applique la loi de Little stock par stock
+             puis suit le plus long chemin de la nomenclature : WIP total / débit compterait
+             chaque branche d'un assemblage comme un produit fini.
+               - Régime transitoire : règle MSER-5. Les observations sont regroupées par lots de 5
+                 et on retient la troncature d qui minimise Σ (Zj - Z̄d)² / (k - d)² sur les
+                 k - d lots restants, avec d <= k / 2. Un minimum en bordure signifie que la
+                 série est encore trop courte pour conclure.
+               - Précision : intervalle de confiance par moyennes de lots (batch means) sur la
+                 partie stationnaire ; pour le lead time, sur les lead times des grands lots.
+               - Réplications : MSER-5 sur la série moyenne des réplications, puis intervalle de
+                 Student sur les estimations des réplications.
+             Seules les moyennes des lots de 5 sont conservées, la mémoire reste faible sur les
+             longues simulations ; le lead time garde en plus deux valeurs par stock et par lot.
+"""
+
+import math
+from statistics import NormalDist
+from typing import Callable, Optional
+import numpy as np
+from ..core.simulation import Simulation
+
+
+METRICS = ["throughput", "lead_time"]
+
+
+def t_quantile(p: float, dof: int) -> float:
+    """
+    Quantile d'ordre p de la loi de Student à `dof` degrés de liberté (sans scipy).
+
+    Formes exactes pour 1 et 2 degrés de liberté, développement de Cornish-Fisher au-delà
+    (erreur inférieure à 0,01 dès 4 degrés de liberté pour p = 0,975).
+    """
+    if dof < 1:
+        raise ValueError("Le nombre de degrés de liberté doit être au moins 1.")
+    if dof == 1:
+        return math.tan(math.pi * (p - 0.5))
+    if dof == 2:
+        return (2 * p - 1) / math.sqrt(2 * p * (1 - p))
+    z = NormalDist().inv_cdf(p)
+    return (z
+            + (z ** 3 + z) / (4 * dof)
+            + (5 * z ** 5 + 16 * z ** 3 + 3 * z) / (96 * dof ** 2)
+            + (3 * z ** 7 + 19 * z ** 5 + 17 * z ** 3 - 15 * z) / (384 * dof ** 3))
+
+
+def mser(batch_means: np.ndarray) -> tuple[int, bool]:
+    """
+    Troncature MSER sur une série de moyennes de lots.
+
+    Returns:
+        tuple[int, bool]: (nombre de lots à écarter, vrai si le minimum n'est pas en bordure).
+    """
+    values = np.asarray(batch_means, dtype=float)
+    k = len(values)
+    if k < 2:
+        return 0, False
+    # Sommes des suffixes, centrées pour la stabilité numérique.
+    centered = values - values.mean()
+    s1 = np.cumsum(centered[::-1])[::-1]
+    s2 = np.cumsum((centered ** 2)[::-1])[::-1]
+    limit = k // 2
+    remaining = k - np.arange(limit + 1)
+    statistic = (s2[:limit + 1] - s1[:limit + 1] ** 2 / remaining) / remaining ** 2
+    d = int(np.argmin(statistic))
+    return d, d < limit
+
+
+def batch_means_interval(values: np.ndarray, confidence: float = 0.95, batches: int = 20) -> tuple[float, float]:
+    """
+    Moyenne et demi-largeur de l'intervalle de confiance par moyennes de lots.
+
+    Les premières valeurs sont écartées si `len(values)` n'est pas multiple de `batches`.
+
+    Raises:
+        ValueError: s'il y a moins de `batches` valeurs.
+    """
+    values = np.asarray(values, dtype=float)
+    if batches < 2 or len(values) < batches:
+        raise ValueError(f"Il faut au moins {max(batches, 2)} valeurs pour {batches} lots.")
+    size = len(values) // batches
+    means = values[len(values) - size * batches:].reshape(batches, size).mean(axis=1)
+    half = t_quantile(0.5 + confidence / 2, batches - 1) * means.std(ddof=1) / math.sqrt(batches)
+    return float(means.mean()), float(half)
+
+
+def ratio_interval(numerator: np.ndarray, denominator: np.ndarray, confidence: float = 0.95,
+                   batches: int = 20) -> tuple[float, float]:
+    """
+    Ratio Σ numérateur / Σ dénominateur et demi-largeur de son intervalle de confiance,
+    estimée sur les moyennes de lots des résidus numérateur - ratio * dénominateur.
+    """
+    numerator = np.asarray(numerator, dtype=float)
+    denominator = np.asarray(denominator, dtype=float)
+    if batches < 2 or len(numerator) < batches:
+        raise ValueError(f"Il faut au moins {max(batches, 2)} valeurs pour {batches} lots.")
+    size = len(numerator) // batches
+    start = len(numerator) - size * batches
+    top = numerator[start:].reshape(batches, size).mean(axis=1)
+    bottom = denominator[start:].reshape(batches, size).mean(axis=1)
+    if bottom.mean() <= 0:
+        return math.inf, math.inf
+    ratio = top.mean() / bottom.mean()
+    residuals = top - ratio * bottom
+    half = t_quantile(0.5 + confidence / 2, batches - 1) * residuals.std(ddof=1) / (math.sqrt(batches) * bottom.mean())
+    return float(ratio), float(half)
+
+
+class OutputSeries:
+    """
+    Série d'observations alimentée en continu, résumée en moyennes de lots de `batch` valeurs.
+
+    Args:
+        batch (int): taille des lots (5 pour MSER-5).
+    """
+
+    def __init__(self, batch: int = 5):
+        if batch < 1:
+            raise ValueError("La taille des lots doit être strictement positive.")
+        self.batch = batch
+        self.count = 0
+        self._means: list[float] = []
+        self._partial = 0.0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self._partial += value
+        if self.count % self.batch == 0:
+            self._means.append(self._partial / self.batch)
+            self._partial = 0.0
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def batch_means(self) -> np.ndarray:
+        return np.array(self._means)
+
+    def truncation(self) -> tuple[int, bool]:
+        """(nombre d'observations à écarter, vrai si le régime transitoire est terminé)."""
+        d, detected = mser(self._means)
+        return d * self.batch, detected
+
+
+class SteadyStateResult:
+    """
+    Estimation d'une mesure de performance en régime stationnaire.
+
+    Attributes:
+        metric (str): "throughput" ou "lead_time".
+        mean (float): estimation ponctuelle.
+        half_width (float): demi-largeur de l'intervalle de confiance.
+        confidence (float): niveau de confiance.
+        warmup (float): durée de régime transitoire écartée (temps simulé).
+        run_length (float): durée simulée (par réplication le cas échéant).
+        observations (int): fenêtres d'observation retenues après troncature (par réplication).
+        replications (int): nombre de réplications (1 pour une simulation unique).
+        converged (bool): vrai si la précision demandée est atteinte.
+    """
+
+    def __init__(self, metric: str, mean: float, half_width: float, confidence: float, warmup: float,
+                 run_length: float, observations: int, replications: int, converged: bool):
+        self.metric = metric
+        self.mean = mean
+        self.half_width = half_width
+        self.confidence = confidence
+        self.warmup = warmup
+        self.run_length = run_length
+        self.observations = observations
+        self.replications = replications
+        self.converged = converged
+
+    @property
+    def relative_half_width(self) -> float:
+        return abs(self.half_width / self.mean) if self.mean else math.inf
+
+    def to_dict(self) -> dict:
+        return {
+            "metric": self.metric,
+            "mean": self.mean,
+            "half_width": self.half_width,
+            "relative_half_width": self.relative_half_width,
+            "confidence": self.confidence,
+            "warmup": self.warmup,
+            "run_length": self.run_length,
+            "observations": self.observations,
+            "replications": self.replications,
+            "converged": self.converged,
+        }
+
+    def __repr__(self):
+        return (f"SteadyStateResult({self.metric}={self.mean:.6g} ± {self.half_width:.3g}, "
+                f"warmup={self.warmup:.6g}, converged={self.converged})")
+
+
+def _check_arguments(metric: str, precision: float, confidence: float) -> None:
+    if metric not in METRICS:
+        raise ValueError(f"La mesure '{metric}' n'est pas valide. Choisissez parmi {METRICS}.")
+    if precision <= 0:
+        raise ValueError("La précision relative doit être strictement positive.")
+    if not 0 < confidence < 1:
+        raise ValueError("Le niveau de confiance doit être compris entre 0 et 1.")
+
+
+def default_interval(vsm_instance) -> float:
+    """Fenêtre d'observation par défaut : 10 fois le plus long process_time de la VSM."""
+    times = [process.process_time for process in vsm_instance.process_list if hasattr(process, "process_time")]
+    longest = max(times, default=0)
+    if longest <= 0:
+        raise ValueError("Impossible de déduire une fenêtre d'observation : précisez `interval`.")
+    return 10.0 * longest
+
+
+class _Observer:
+    """
+    Avance une simulation fenêtre par fenêtre et relève le débit, ainsi que les aires et
+    sorties des stocks si `flows` est vrai.
+    """
+
+    def __init__(self, simulation: Simulation, interval: float, flows: bool = False):
+        if interval <= 0:
+            raise ValueError("La fenêtre d'observation doit être strictement positive.")
+        self.simulation = simulation
+        self.interval = interval
+        self.time = simulation.now
+        self._finished = simulation.finished()
+        self.flows = None
+        if flows:
+            if not hasattr(simulation, "track_flows"):
+                raise ValueError(f"{type(simulation).__name__} ne suit pas les temps de séjour : lead time indisponible.")
+            self.flows = simulation.track_flows()
+
+    def step(self) -> float:
+        """Simule une fenêtre ; retourne le débit de la fenêtre."""
+        self.time += self.interval
+        self.simulation.run(self.time)
+        finished = self.simulation.finished()
+        rate = (finished - self._finished) / self.interval
+        self._finished = finished
+        return rate
+
+    def take(self) -> tuple[np.ndarray, np.ndarray]:
+        """Aires et sorties de chaque stock pendant la dernière fenêtre."""
+        return self.flows.take(self.time)
+
+
+class _FlowSeries:
+    """
+    Aires et sorties des stocks cumulées par lots de `batch` fenêtres, et lead time de chaque
+    lot (pour MSER).
+    """
+
+    def __init__(self, flows, batch: int = 5):
+        self.flows = flows
+        self.batch = batch
+        self.count = 0
+        self._areas: list[np.ndarray] = []
+        self._outs: list[np.ndarray] = []
+        self._leads: list[float] = []
+        self._area = self._out = 0.0
+
+    def add(self, area: np.ndarray, out: np.ndarray) -> None:
+        self.count += 1
+        self._area = self._area + area
+        self._out = self._out + out
+        if self.count % self.batch == 0:
+            self._areas.append(self._area)
+            self._outs.append(self._out)
+            self._leads.append(self.flows.lead_time(self._area, self._out))
+            self._area = self._out = 0.0
+
+    def truncation(self) -> tuple[int, bool]:
+        d, detected = mser(self._leads)
+        return d * self.batch, detected
+
+    def interval(self, lots: int, confidence: float, batches: int) -> tuple[float, float]:
+        """Lead time des lots à partir de `lots` et demi-largeur par grands lots."""
+        areas, outs = np.array(self._areas[lots:]), np.array(self._outs[lots:])
+        size = len(areas) // batches
+        start = len(areas) - size * batches
+        areas, outs = areas[start:], outs[start:]
+        big = [self.flows.lead_time(area, out) for area, out in
+               zip(areas.reshape(batches, size, -1).sum(axis=1), outs.reshape(batches, size, -1).sum(axis=1))]
+        half = t_quantile(0.5 + confidence / 2, batches - 1) * np.std(big, ddof=1) / math.sqrt(batches)
+        return self.flows.lead_time(areas.sum(axis=0), outs.sum(axis=0)), float(half)
+
+
+def run_to_precision(simulation: Simulation, metric: str = "throughput", precision: float = 0.05,
+                     confidence: float = 0.95, interval: Optional[float] = None,
+                     max_time: float = math.inf, batches: int = 20, check_growth: float = 1.1) -> SteadyStateResult:
+    """
+    Simule jusqu'à ce que l'intervalle de confiance de `metric` atteigne la précision relative
+    `precision`, ou jusqu'à `max_time`.
+
+    Le régime transitoire est réévalué par MSER-5 à chaque contrôle ; les contrôles ont lieu
+    chaque fois que le nombre d'observations a crû d'un facteur `check_growth`, ce qui garde
+    un coût total linéaire.
+
+    Args:
+        simulation (Simulation): simulation à faire avancer (éventuellement déjà démarrée).
+        metric (str): "throughput" (produits finis par unité de temps) ou "lead_time" (loi de
+                      Little par stock, voir `Simulation.track_flows`).
+        precision (float): demi-largeur relative visée.
+        confidence (float): niveau de confiance de l'intervalle.
+        interval (Optional[float]): durée d'une fenêtre d'observation (voir `default_interval`).
+        max_time (float): date limite de simulation.
+        batches (int): nombre de lots pour l'intervalle de confiance.
+
+    Returns:
+        SteadyStateResult: estimation courante ; `converged` est faux si `max_time` a été atteint.
+
+    Raises:
+        ValueError: si les paramètres sont invalides, ou si `max_time` est infini et que la
+                    simulation ne produit plus d'événements.
+    """
+    _check_arguments(metric, precision, confidence)
+    if check_growth <= 1:
+        raise ValueError("check_growth doit être strictement supérieur à 1.")
+    observer = _Observer(simulation, interval or default_interval(simulation.vsm), metric == "lead_time")
+    start = observer.time
+    rates = OutputSeries()
+    leads = _FlowSeries(observer.flows) if observer.flows is not None else None
+    next_check = 5 * batches
+    mean = half = math.nan
+    warmup, kept, converged = 0, 0, False
+    while observer.time + observer.interval <= max_time:
+        rates.add(observer.step())
+        if leads is not None:
+            leads.add(*observer.take())
+        if simulation.next_time() == math.inf:
+            if math.isinf(max_time):
+                raise ValueError("La simulation ne produit plus d'événements : la précision ne peut pas être atteinte.")
+            break
+        if rates.count < next_check or rates.count % rates.batch:
+            continue
+        next_check = max(next_check + rates.batch, int(rates.count * check_growth))
+        cut, detected = rates.truncation()
+        if leads is not None:
+            cut_lead, detected_lead = leads.truncation()
+            cut, detected = max(cut, cut_lead), detected and detected_lead
+        if not detected:
+            continue
+        lots = cut // rates.batch
+        if len(rates.batch_means) - lots < batches:
+            continue
+        warmup, kept = cut, rates.count - cut
+        if leads is None:
+            mean, half = batch_means_interval(rates.batch_means[lots:], confidence, batches)
+        else:
+            mean, half = leads.interval(lots, confidence, batches)
+        if math.isfinite(half) and mean and half <= precision * abs(mean):
+            converged = True
+            break
+    return SteadyStateResult(metric, mean, half, confidence, float(warmup * observer.interval),
+                             observer.time - start, kept, 1, converged)
+
+
+def replicate(build: Callable[[], object], until: float, metric: str = "throughput", precision: float = 0.05,
+              confidence: float = 0.95, interval: Optional[float] = None, seed: int = 0,
+              min_replications: int = 5, max_replications: int = 100,
+              simulation_factory: Callable = Simulation) -> SteadyStateResult:
+    """
+    Étude par réplications indépendantes, arrêtée dès que la précision est atteinte.
+
+    Chaque réplication simule une VSM neuve `build()` jusqu'à `until` avec la graine
+    `seed + numéro de réplication`. La troncature MSER-5 est calculée sur la moyenne des
+    séries de toutes les réplications, puis chaque réplication fournit une estimation
+    (débit moyen, ou lead time par stock sur la partie retenue) ; l'intervalle de Student porte
+    sur ces estimations.
+    Si le régime transitoire dépasse la moitié de `until`, l'étude s'arrête non convergée.
+
+    Args:
+        build (Callable[[], vsm]): construit une VSM dans son état initial.
+        until (float): durée de chaque réplication.
+        min_replications (int): réplications simulées avant le premier contrôle (au moins 2).
+        max_replications (int): nombre maximal de réplications.
+        simulation_factory (Callable): classe de simulation, appelée avec (vsm, seed=...).
+
+    Returns:
+        SteadyStateResult
+    """
+    _check_arguments(metric, precision, confidence)
+    if min_replications < 2 or max_replications < min_replications:
+        raise ValueError("Il faut 2 <= min_replications <= max_replications.")
+    rates, flows = [], []
+    mean = half = math.nan
+    warmup, kept, converged = 0, 0, False
+    window = interval
+    for replication in range(max_replications):
+        model = build()
+        window = window or default_interval(model)
+        observer = _Observer(simulation_factory(model, seed=seed + replication), window, metric == "lead_time")
+        steps = int(until // window)
+        if steps < 10:
+            raise ValueError("La durée d'une réplication doit couvrir au moins 10 fenêtres d'observation.")
+        series, areas, outs = [], [], []
+        for _ in range(steps):
+            series.append(observer.step())
+            if observer.flows is not None:
+                area, out = observer.take()
+                areas.append(area)
+                outs.append(out)
+        rates.append(np.array(series))
+        if observer.flows is not None:
+            flows.append((observer.flows, np.array(areas), np.array(outs)))
+        if replication + 1 < min_replications:
+            continue
+        cut, detected = _average_truncation(rates)
+        if metric == "lead_time":
+            cut_lead, detected_lead = _average_truncation([_lot_leads(*flow) for flow in flows], batch=1)
+            cut, detected = max(cut, cut_lead * 5), detected and detected_lead
+        warmup, kept = cut, steps - cut
+        if metric == "throughput":
+            estimates = np.array([values[cut:].mean() for values in rates])
+        else:
+            estimates = np.array([tracker.lead_time(area[cut:].sum(axis=0), out[cut:].sum(axis=0))
+                                  for tracker, area, out in flows])
+        count = len(estimates)
+        mean = float(estimates.mean())
+        half = float(t_quantile(0.5 + confidence / 2, count - 1) * estimates.std(ddof=1) / math.sqrt(count))
+        if not detected:
+            # Transitoire plus long que la moitié d'une réplication : d'autres réplications
+            # n'y changeraient rien, il faut allonger `until`.
+            break
+        if math.isfinite(half) and mean and half <= precision * abs(mean):
+            converged = True
+            break
+    return SteadyStateResult(metric, mean, half, confidence, float(warmup * window), until, kept, len(rates), converged)
+
+
+def _lot_leads(flows, areas: np.ndarray, outs: np.ndarray, batch: int = 5) -> np.ndarray:
+    """Lead time de chaque lot de `batch` fenêtres d'une réplication."""
+    lots = len(areas) // batch
+    areas = areas[:lots * batch].reshape(lots, batch, -1).sum(axis=1)
+    outs = outs[:lots * batch].reshape(lots, batch, -1).sum(axis=1)
+    return np.array([flows.lead_time(area, out) for area, out in zip(areas, outs)])
+
+
+def _average_truncation(series: list[np.ndarray], batch: int = 5) -> tuple[int, bool]:
+    """Troncature MSER-5 (en observations) de la moyenne des séries des réplications."""
+    average = np.mean(series, axis=0)
+    lots = len(average) // batch
+    d, detected = mser(average[:lots * batch].reshape(lots, batch).mean(axis=1))
+    return d * batch, detected
@@ -0,0 +1,208 @@
+"""
+Module: cli
+Description: Point d'entrée `auto-vsm` (ou `python -m vsm`).
+
+    auto-vsm run    MODELE.json --until 1000 [--seed 1] [--instrumentation counters]
+                    [--precision 0.02 [--metric throughput|lead_time] [--interval 10]]
+    auto-vsm bench  MODELE.json --until 1000 [--repeat 5]
+    auto-vsm render MODELE.json [-o process_graph] [--format dot|png|svg|pdf]
+    auto-vsm sweep  MODELE.json --scale 0.8:1.2:9 [--station M1] [--simulate --until 1000]
+
+Seuls argparse et json sont chargés au démarrage : numpy, graphviz, la simulation et
+l'analyse sont importés par la sous-commande qui en a besoin, afin de garder un coût de
+lancement faible pour les traitements par lots.
+"""
+
+import argparse
+import json
+import math
+import sys
+from typing import Optional
+
+
+def _named(values: dict, products: dict) -> dict:
+    """Remplace les clés `Produit_<id>` par le nom du produit dans le fichier modèle."""
+    names = {str(produit): name for name, produit in products.items()}
+    return {names.get(key, key): value for key, value in values.items()}
+
+
+def _finite(data):
+    """Remplace NaN et infinis par None : JSON n'a pas de valeur pour eux."""
+    if isinstance(data, dict):
+        return {key: _finite(value) for key, value in data.items()}
+    if isinstance(data, (list, tuple)):
+        return [_finite(value) for value in data]
+    if isinstance(data, float) and not math.isfinite(data):
+        return None
+    return data
+
+
+def _print_json(data, indent: Optional[int]) -> None:
+    print(json.dumps(_finite(data), indent=indent, default=float, allow_nan=False))
+
+
+def _parse_scale(text: str) -> list[float]:
+    try:
+        start, stop, count = text.split(":")
+        start, stop, count = float(start), float(stop), int(count)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Échelle invalide '{text}' (attendu DEBUT:FIN:NOMBRE).")
+    if count < 1:
+        raise argparse.ArgumentTypeError("Le nombre de points doit être au moins 1.")
+    if count == 1:
+        return [start]
+    return [start + (stop - start) * i / (count - 1) for i in range(count)]
+
+
+def cmd_run(args) -> int:
+    from .core.instrumentation import Instrumentation
+    from .core.simulation import Simulation
+    from .infra.model_file import load_model
+
+    model, products = load_model(args.model)
+    instrumentation = Instrumentation(args.instrumentation)
+    simulation = Simulation(model, seed=args.seed, instrumentation=instrumentation)
+    if args.precision is None:
+        results = simulation.run(args.until)
+    else:
+        from .analysis.steady_state import run_to_precision
+        steady_state = run_to_precision(simulation, args.metric, args.precision,
+                                        interval=args.interval, max_time=args.until)
+        results = simulation.results()
+        results["steady_state"] = steady_state.to_dict()
+    results["throughput"] = _named(results["throughput"], products)
+    if instrumentation.enabled:
+        results["instrumentation"] = instrumentation.snapshot()
+    _print_json(results, args.indent)
+    return 0
+
+
+def cmd_bench(args) -> int:
+    import time
+    from .core.instrumentation import Instrumentation
+    from .core.simulation import Simulation
+    from .infra.model_file import load_model
+
+    timings, events = [], 0
+    for repeat in range(args.repeat):
+        model, _ = load_model(args.model)
+        instrumentation = Instrumentation("disabled")
+        start = time.perf_counter()
+        events = Simulation(model, seed=args.seed + repeat, instrumentation=instrumentation).run(args.until)["events"]
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+    _print_json({
+        "repeat": args.repeat,
+        "events": events,
+        "best_wall_time": best,
+        "mean_wall_time": sum(timings) / len(timings),
+        "events_per_second": events / best if best > 0 else 0.0,
+    }, args.indent)
+    return 0
+
+
+def cmd_render(args) -> int:
+    from .infra.model_file import load_vsm
+
+    dot = load_vsm(args.model).get_dot()
+    if args.format == "dot":
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as stream:
+                stream.write(dot)
+        else:
+            sys.stdout.write(dot)
+        return 0
+    import graphviz
+    path = graphviz.Source(dot).render(args.output or "process_graph", format=args.format, cleanup=True)
+    print(path)
+    return 0
+
+
+def cmd_sweep(args) -> int:
+    from .infra.model_file import load_model
+
+    model, products = load_model(args.model)
+    scales = args.scale
+    stations = {process.get_name() for process in model.process_list if hasattr(process, "process_time")}
+    unknown = set(args.station or []) - stations
+    if unknown:
+        raise ValueError(f"Stations inconnues : {', '.join(sorted(unknown))}.")
+    if args.simulate:
+        from .core.simulation import Simulation
+        rows = []
+        for scale in scales:
+            model, products = load_model(args.model)
+            for process in model.process_list:
+                if hasattr(process, "process_time") and (not args.station or process.get_name() in args.station):
+                    process.process_time *= scale
+            results = Simulation(model, seed=args.seed).run(args.until)
+            rows.append({"scale": scale, "throughput": _named(results["throughput"], products)})
+        _print_json(rows, args.indent)
+        return 0
+
+    import numpy as np
+    from .analysis.queueing import QueueingNetwork
+
+    network = QueueingNetwork(model)
+    selected = np.array([not args.station or name in args.station for name in network.names])
+    factors = np.where(selected, np.array(scales)[:, None], 1.0)
+    result = network.solve(network.process_time * factors, network.time_variability)
+    order = result.rank("lead_time", top=args.top) if args.top else range(len(scales))
+    rows = [{
+        "scale": scales[i],
+        "lead_time": float(result.lead_time[i]),
+        "throughput": _named({name: float(values[i]) for name, values in result.product_throughput.items()}, products),
+    } for i in order]
+    _print_json(rows, args.indent)
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="auto-vsm", description="Simulation et analyse de Value Stream Maps.")
+    parser.add_argument("--indent", type=int, default=None, help="Indentation de la sortie JSON.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Simule un modèle et affiche les résultats.")
+    run.add_argument("model")
+    run.add_argument("--until", type=float, required=True)
+    run.add_argument("--seed", type=int, default=None)
+    run.add_argument("--instrumentation", choices=["disabled", "counters", "sampled"], default="disabled")
+    run.add_argument("--precision", type=float, default=None,
+                     help="Arrête la simulation dès que la demi-largeur relative de l'intervalle de confiance "
+                          "est atteinte (--until devient la date limite).")
+    run.add_argument("--metric", choices=["throughput", "lead_time"], default="throughput")
+    run.add_argument("--interval", type=float, default=None, help="Fenêtre d'observation pour --precision.")
+    run.set_defaults(handler=cmd_run)
+
+    bench = commands.add_parser("bench", help="Mesure la vitesse de simulation d'un modèle.")
+    bench.add_argument("model")
+    bench.add_argument("--until", type=float, required=True)
+    bench.add_argument("--repeat", type=int, default=3)
+    bench.add_argument("--seed", type=int, default=0)
+    bench.set_defaults(handler=cmd_bench)
+
+    render = commands.add_parser("render", help="Dessine le graphe des process.")
+    render.add_argument("model")
+    render.add_argument("-o", "--output", default=None)
+    render.add_argument("--format", choices=["dot", "png", "svg", "pdf"], default="dot")
+    render.set_defaults(handler=cmd_render)
+
+    sweep = commands.add_parser("sweep", help="Balaye un facteur d'échelle sur les temps de process.")
+    sweep.add_argument("model")
+    sweep.add_argument("--scale", type=_parse_scale, required=True, help="DEBUT:FIN:NOMBRE")
+    sweep.add_argument("--station", action="append", help="Station concernée (répétable ; toutes par défaut).")
+    sweep.add_argument("--top", type=int, default=None, help="N'affiche que les N meilleurs lead times.")
+    sweep.add_argument("--simulate", action="store_true", help="Simule chaque point au lieu de l'estimation analytique.")
+    sweep.add_argument("--until", type=float, default=1000.0)
+    sweep.add_argument("--seed", type=int, default=0)
+    sweep.set_defaults(handler=cmd_sweep)
+    return parser
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        return args.handler(args)
+    except (OSError, ValueError, KeyError) as error:
+        print(f"auto-vsm: {error}", file=sys.stderr)
+        return 1
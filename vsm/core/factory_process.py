@@ -1,8 +1,8 @@
-from dataclasses import dataclass
-from inventory_management import Inventaire
-from product_mangement import Produit
-from process import Process
-import numpy as np
+from .inventory_management import Inventaire
+from .product_mangement import Produit
+from .process import Process
+from .instrumentation import ProcessStats
+from typing import Optional
 
 
 SECURE_DELETE = True
@@ -23,6 +23,9 @@ class Facory_Process(Process):
         self.quality = quality
         self.nomenclature : dict[Produit, int] = {}
         # nomenclature : négatif => produit utile pour fabriquer; positif => produit fabriqué
+        self.stats : Optional[ProcessStats] = None   # compteurs, installés par la simulation
+        self.rng = None                              # générateur aléatoire propre (sinon np.random)
+        self.nomenclature_version = 0                # incrémenté à chaque modification de la nomenclature
     
     
     def set_nomenclature_produit(self,produit : Produit, qte : int) -> bool:
@@ -39,6 +42,7 @@ class Facory_Process(Process):
             return False
         self.setup_inventory(produit)
         self.nomenclature[produit] = qte
+        self.nomenclature_version += 1
         return True
   
         
@@ -59,6 +63,7 @@ class Facory_Process(Process):
             return False
         del self.nomenclature[produit]
         self.delete_product(produit)
+        self.nomenclature_version += 1
         return True
     
     def get_nomenclature(self) -> dict[Produit,int]:
@@ -101,7 +106,11 @@ class Facory_Process(Process):
         return self._craft_produit()
     
     def calcul_process_time(self) -> float:
-        return self.process_time + np.random.normal(0,self.time_variability)
+        rng = self.rng
+        if rng is None:
+            import numpy as np   # importé au premier tirage seulement
+            rng = np.random
+        return self.process_time + rng.normal(0,self.time_variability)
     
     def _craft_produit(self):
         #on fabrique (les valeur negative de la nomenclature sont les produit utile pour fabriquer)
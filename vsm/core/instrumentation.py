@@ -0,0 +1,199 @@
+"""
+Module: instrumentation
+Description: Compteurs par process et mesures de la boucle de simulation.
+             Trois modes :
+               - "disabled" : aucune mesure, la simulation appelle directement les méthodes
+                 des process (coût nul).
+               - "counters" : compteurs simples (crafts, appels, temps affamé / bloqué).
+               - "sampled"  : compteurs + chronométrage d'un appel sur `sample_every`
+                 de `can_process` et `_craft_produit`, extrapolé au nombre total d'appels.
+"""
+
+import json
+import time
+from typing import Callable, Optional
+
+
+DISABLED = "disabled"
+COUNTERS = "counters"
+SAMPLED = "sampled"
+MODES = [DISABLED, COUNTERS, SAMPLED]
+
+
+class ProcessStats:
+    """
+    Compteurs d'un process. Les temps affamé / bloqué sont en temps simulé, les temps CPU en secondes.
+    Le temps bloqué n'augmente que derrière une liaison de capacité bornée (`Link.capacity`) :
+    avec des liaisons illimitées, un process n'est jamais bloqué et il reste à 0.
+    """
+    __slots__ = ("crafts", "starved_time", "blocked_time", "can_process_calls", "craft_calls",
+                 "can_process_time", "craft_time", "timed_can_process", "timed_crafts")
+
+    def __init__(self):
+        self.crafts = 0
+        self.starved_time = 0.0
+        self.blocked_time = 0.0
+        self.can_process_calls = 0
+        self.craft_calls = 0
+        self.can_process_time = 0.0
+        self.craft_time = 0.0
+        self.timed_can_process = 0
+        self.timed_crafts = 0
+
+    def estimated_can_process_time(self) -> float:
+        if not self.timed_can_process:
+            return 0.0
+        return self.can_process_time * self.can_process_calls / self.timed_can_process
+
+    def estimated_craft_time(self) -> float:
+        if not self.timed_crafts:
+            return 0.0
+        return self.craft_time * self.craft_calls / self.timed_crafts
+
+    def to_dict(self) -> dict:
+        return {
+            "crafts": self.crafts,
+            "starved_time": self.starved_time,
+            "blocked_time": self.blocked_time,
+            "can_process_calls": self.can_process_calls,
+            "craft_calls": self.craft_calls,
+            "can_process_cpu_time": self.estimated_can_process_time(),
+            "craft_cpu_time": self.estimated_craft_time(),
+        }
+
+
+class Instrumentation:
+    """
+    Collecte les compteurs des process et de la boucle de simulation.
+
+    Les compteurs sont portés par chaque process (attribut `stats`), l'instance
+    garde la liste des process suivis et les mesures de la boucle (événements, temps mural).
+    """
+
+    def __init__(self, mode: str = DISABLED, sample_every: int = 64):
+        if mode not in MODES:
+            raise ValueError(f"Le mode '{mode}' n'est pas valide. Choisissez parmi {MODES}.")
+        if sample_every <= 0:
+            raise ValueError("sample_every doit être strictement positif.")
+        self.mode = mode
+        self.sample_every = sample_every
+        self.processes = []
+        self.events = 0
+        self.wall_time = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != DISABLED
+
+    def attach(self, process) -> None:
+        """Installe (ou retire en mode désactivé) les compteurs sur un process."""
+        process.stats = ProcessStats() if self.enabled else None
+        if self.enabled:
+            self.processes.append(process)
+
+    def wrap(self, process) -> tuple[Callable[[], bool], Callable[[], float]]:
+        """
+        Retourne les fonctions (can_process, _craft_produit) que la simulation doit appeler
+        pour ce process, instrumentées selon le mode.
+        """
+        can_process = process.can_process
+        craft = process._craft_produit
+        stats = process.stats
+        if stats is None:
+            return can_process, craft
+
+        if self.mode == COUNTERS:
+            def counted_can_process() -> bool:
+                stats.can_process_calls += 1
+                return can_process()
+
+            def counted_craft() -> float:
+                stats.craft_calls += 1
+                return craft()
+
+            return counted_can_process, counted_craft
+
+        sample_every = self.sample_every
+        clock = time.perf_counter
+
+        def sampled_can_process() -> bool:
+            stats.can_process_calls += 1
+            if stats.can_process_calls % sample_every:
+                return can_process()
+            start = clock()
+            result = can_process()
+            stats.can_process_time += clock() - start
+            stats.timed_can_process += 1
+            return result
+
+        def sampled_craft() -> float:
+            stats.craft_calls += 1
+            if stats.craft_calls % sample_every:
+                return craft()
+            start = clock()
+            result = craft()
+            stats.craft_time += clock() - start
+            stats.timed_crafts += 1
+            return result
+
+        return sampled_can_process, sampled_craft
+
+    def record_loop(self, events: int, wall_time: float) -> None:
+        self.events += events
+        self.wall_time += wall_time
+
+    @property
+    def events_per_second(self) -> float:
+        return self.events / self.wall_time if self.wall_time > 0 else 0.0
+
+    def snapshot(self) -> dict:
+        """Instantané des compteurs sous forme de dict."""
+        return {
+            "mode": self.mode,
+            "loop": {
+                "events": self.events,
+                "wall_time": self.wall_time,
+                "events_per_second": self.events_per_second,
+            },
+            "processes": {process.get_name(): process.stats.to_dict() for process in self.processes},
+        }
+
+    def to_json(self, indent: Optional[int] = None) -> str:
+        return json.dumps(self.snapshot(), indent=indent)
+
+    def hot_spots(self, key: str = "cpu_time", top: Optional[int] = 10) -> list[tuple[str, float]]:
+        """
+        Classe les process par ordre décroissant d'un indicateur.
+
+        Args:
+            key (str): "cpu_time" (can_process + _craft_produit), ou un champ de
+                       ProcessStats.to_dict() (ex : "starved_time", "blocked_time", "crafts").
+            top (Optional[int]): Nombre de lignes retournées ; None pour tout.
+
+        Returns:
+            list[tuple[str, float]]: (nom du process, valeur)
+        """
+        ranking = []
+        for process in self.processes:
+            values = process.stats.to_dict()
+            if key == "cpu_time":
+                value = values["can_process_cpu_time"] + values["craft_cpu_time"]
+            elif key in values:
+                value = values[key]
+            else:
+                raise KeyError(f"Indicateur inconnu : {key}.")
+            ranking.append((process.get_name(), value))
+        ranking.sort(key=lambda item: item[1], reverse=True)
+        return ranking if top is None else ranking[:top]
+
+    def report(self, top: int = 10) -> str:
+        """Rapport texte des points chauds (CPU, famine, blocage)."""
+        lines = [f"Instrumentation ({self.mode}) : {self.events} événements, "
+                 f"{self.events_per_second:.0f} événements/s"]
+        for key, title in (("cpu_time", "Temps CPU estimé (s)"),
+                           ("starved_time", "Temps affamé (temps simulé)"),
+                           ("blocked_time", "Temps bloqué (temps simulé)")):
+            lines.append(f"{title} :")
+            for rank, (name, value) in enumerate(self.hot_spots(key, top), start=1):
+                lines.append(f"  {rank:>3}. {name:<30} {value:.6g}")
+        return "\n".join(lines)
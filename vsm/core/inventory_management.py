@@ -1,4 +1,4 @@
-from product_mangement import Produit
+from .product_mangement import Produit
 
 class Inventaire:
     def __init__(self):
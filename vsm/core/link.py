@@ -0,0 +1,147 @@
+"""
+Module: link
+Description: Liaisons de la VSM et contrôle des en-cours.
+             - Link : liaison parent -> enfant avec capacité du stock tampon en entrée de l'enfant
+               (kanban), taille des lots de transfert et temps de transport. Une liaison se
+               déballe comme l'ancien tuple (parent, child).
+             - ConwipLoop : plafond d'en-cours sur un groupe de process (CONWIP).
+             - RingBuffer : file FIFO (date, quantité) sur tableaux préalloués, utilisée par la
+               simulation pour la matière en transport.
+"""
+
+from array import array
+from typing import Iterator, Optional
+from .process import Process
+
+
+class Link:
+    """
+    Liaison entre deux process.
+
+    Args:
+        parent (Process): process émetteur.
+        child (Process): process receveur.
+        capacity (Optional[int]): quantité maximale d'un produit en stock chez l'enfant ou en
+                                  transport vers lui ; le parent est bloqué quand elle est
+                                  atteinte. None : stock illimité. Ignorée vers un Process
+                                  de stockage, qui ne consomme jamais.
+        transfer_batch (int): les produits ne partent que par multiples de ce lot.
+        transport_time (float): durée du transport.
+
+    Raises:
+        ValueError: si un paramètre est invalide, ou si le lot dépasse la capacité.
+    """
+    __slots__ = ("parent", "child", "capacity", "transfer_batch", "transport_time")
+
+    def __init__(self, parent: Process, child: Process, capacity: Optional[int] = None,
+                 transfer_batch: int = 1, transport_time: float = 0.0):
+        if capacity is not None and capacity < 1:
+            raise ValueError("La capacité d'une liaison doit être au moins 1.")
+        if transfer_batch < 1:
+            raise ValueError("Le lot de transfert doit être au moins 1.")
+        if capacity is not None and transfer_batch > capacity:
+            raise ValueError(f"Le lot de transfert ({transfer_batch}) dépasse la capacité ({capacity}).")
+        if transport_time < 0:
+            raise ValueError("Le temps de transport ne peut pas être négatif.")
+        self.parent = parent
+        self.child = child
+        self.capacity = capacity
+        self.transfer_batch = transfer_batch
+        self.transport_time = transport_time
+
+    @property
+    def bounded(self) -> bool:
+        return self.capacity is not None
+
+    @property
+    def plain(self) -> bool:
+        """Vrai pour une liaison sans capacité, lot ni transport (transfert immédiat et illimité)."""
+        return self.capacity is None and self.transfer_batch == 1 and self.transport_time == 0
+
+    def __iter__(self) -> Iterator[Process]:
+        return iter((self.parent, self.child))
+
+    def __repr__(self):
+        return (f"Link({self.parent.get_name()} -> {self.child.get_name()}, capacity={self.capacity}, "
+                f"transfer_batch={self.transfer_batch}, transport_time={self.transport_time})")
+
+
+class ConwipLoop:
+    """
+    Boucle CONWIP : les process d'entrée de la boucle ne lancent un craft que si l'en-cours
+    de la boucle est inférieur à `limit`.
+
+    L'en-cours compte les produits fabriqués par la boucle et pas encore sortis (stocks des
+    membres et transports entre membres) ; la matière venant de l'extérieur n'est comptée
+    qu'une fois consommée par un membre.
+
+    Args:
+        processes (list[Process]): process de la boucle.
+        limit (int): en-cours maximal.
+    """
+
+    def __init__(self, processes: list[Process], limit: int):
+        if not processes:
+            raise ValueError("Une boucle CONWIP doit contenir au moins un process.")
+        if limit < 1:
+            raise ValueError("La limite CONWIP doit être au moins 1.")
+        self.processes = list(processes)
+        self.limit = limit
+
+    def __repr__(self):
+        return f"ConwipLoop({[process.get_name() for process in self.processes]}, limit={self.limit})"
+
+
+class RingBuffer:
+    """
+    File FIFO de couples (date, quantité) sur deux tableaux préalloués : ajouter ou retirer un
+    élément n'alloue rien ; la taille ne double que si la file est pleine.
+
+    Args:
+        size (int): nombre d'éléments préalloués.
+    """
+    __slots__ = ("_times", "_quantities", "_head", "_count")
+
+    def __init__(self, size: int = 8):
+        size = max(1, size)
+        self._times = array("d", bytes(8 * size))
+        self._quantities = array("q", bytes(8 * size))
+        self._head = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def push(self, when: float, quantite: int) -> None:
+        size = len(self._times)
+        if self._count == size:
+            self._grow()
+            size = len(self._times)
+        tail = (self._head + self._count) % size
+        self._times[tail] = when
+        self._quantities[tail] = quantite
+        self._count += 1
+
+    def peek_time(self) -> float:
+        if not self._count:
+            raise IndexError("File vide.")
+        return self._times[self._head]
+
+    def pop(self) -> int:
+        """Retire l'élément le plus ancien et retourne sa quantité."""
+        if not self._count:
+            raise IndexError("File vide.")
+        quantite = self._quantities[self._head]
+        self._head = (self._head + 1) % len(self._times)
+        self._count -= 1
+        return quantite
+
+    def _grow(self) -> None:
+        size = len(self._times)
+        order = [(self._head + i) % size for i in range(self._count)]
+        times = array("d", bytes(16 * size))
+        quantities = array("q", bytes(16 * size))
+        for i, j in enumerate(order):
+            times[i] = self._times[j]
+            quantities[i] = self._quantities[j]
+        self._times, self._quantities, self._head = times, quantities, 0
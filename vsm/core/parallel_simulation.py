@@ -0,0 +1,489 @@
+"""
+Module: parallel_simulation
+Description: Simulation parallèle d'une grande VSM découpée en partitions faiblement couplées
+             (par exemple une partition par cellule de production).
+             Chaque partition est simulée par un worker (processus séparé). Les transferts de
+             matière entre partitions passent par des files multiprocessing, et la
+             synchronisation est conservative (Chandy-Misra-Bryant) : chaque worker publie une
+             borne inférieure de la date de ses prochains envois (date de son prochain événement,
+             ou horizon traité + lookahead, le lookahead étant le plus petit temps de process
+             garanti de la partition). Le graphe des partitions est rendu acyclique en fusionnant
+             ses composantes fortement connexes.
+             Pour une même graine, les résultats sont identiques à ceux de `Simulation`.
+"""
+
+import heapq
+import math
+import multiprocessing
+import pickle
+import queue
+from collections import deque
+from typing import Hashable, Optional
+from .process import Process
+from .factory_process import Facory_Process
+from .simulation import Simulation, _Station
+
+
+class _Arrival:
+    """Matière reçue d'une autre partition, traitée à la date et au rang de l'émetteur."""
+    __slots__ = ("deliveries",)
+
+    def __init__(self, deliveries: list):
+        self.deliveries = deliveries
+
+
+def _topological_order(processes: list[Process], links) -> list[Process]:
+    position = {process: index for index, process in enumerate(processes)}
+    indegree = [0] * len(processes)
+    children: list[list[int]] = [[] for _ in processes]
+    for parent, child in links:
+        children[position[parent]].append(position[child])
+        indegree[position[child]] += 1
+    ready = deque(index for index, degree in enumerate(indegree) if degree == 0)
+    order = []
+    while ready:
+        index = ready.popleft()
+        order.append(index)
+        for child in children[index]:
+            indegree[child] -= 1
+            if indegree[child] == 0:
+                ready.append(child)
+    # Les process pris dans une boucle sont ajoutés à la fin, dans l'ordre de la VSM.
+    seen = set(order)
+    order += [index for index in range(len(processes)) if index not in seen]
+    return [processes[index] for index in order]
+
+
+def _strongly_connected(nodes: list, edges: dict) -> list[list]:
+    """Composantes fortement connexes (Tarjan, version itérative)."""
+    index_of, low, stack, on_stack, components = {}, {}, [], set(), []
+    counter = 0
+    for root in nodes:
+        if root in index_of:
+            continue
+        work = [(root, iter(edges.get(root, ())))]
+        index_of[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            node, successors = work[-1]
+            advanced = False
+            for successor in successors:
+                if successor not in index_of:
+                    index_of[successor] = low[successor] = counter
+                    counter += 1
+                    stack.append(successor)
+                    on_stack.add(successor)
+                    work.append((successor, iter(edges.get(successor, ()))))
+                    advanced = True
+                    break
+                if successor in on_stack:
+                    low[node] = min(low[node], index_of[successor])
+            if advanced:
+                continue
+            work.pop()
+            if work:
+                low[work[-1][0]] = min(low[work[-1][0]], low[node])
+            if low[node] == index_of[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member is node:
+                        break
+                components.append(component)
+    return components
+
+
+def partition_vsm(vsm_instance, n_partitions: int = 2,
+                  cells: Optional[dict[str, Hashable]] = None) -> list[list[Process]]:
+    """
+    Découpe la VSM en partitions le long de vsm.links.
+
+    Args:
+        vsm_instance: VSM à découper.
+        n_partitions (int): Nombre de partitions visé quand `cells` n'est pas fourni : l'ordre
+                            topologique est coupé en tranches de tailles égales.
+        cells (Optional[dict[str, Hashable]]): Cellule de production de chaque process (par nom).
+                                               Les process absents forment leur propre partition.
+
+    Les contraintes suivantes peuvent fusionner des partitions :
+      - un process dont un produit peut partir vers plusieurs enfants reste avec ces enfants
+        (le choix du receveur dépend de leurs stocks) ;
+      - les deux extrémités d'une liaison de capacité bornée, et les process d'une même boucle
+        CONWIP, restent ensemble (le blocage remonte vers l'amont) ;
+      - les partitions formant une boucle sont regroupées.
+
+    Returns:
+        list[list[Process]]: partitions en ordre topologique, process dans l'ordre de la VSM.
+    """
+    processes = vsm_instance.process_list
+    if n_partitions <= 0:
+        raise ValueError("n_partitions doit être strictement positif.")
+    parent = {process: process for process in processes}
+
+    def find(process):
+        while parent[process] is not process:
+            parent[process] = parent[parent[process]]
+            process = parent[process]
+        return process
+
+    def union(a, b):
+        root_a, root_b = find(a), find(b)
+        if root_a is not root_b:
+            parent[root_b] = root_a
+
+    if cells is not None:
+        first_of_cell = {}
+        for process in processes:
+            cell = cells.get(process.get_name(), ("__process__", process.get_name()))
+            if cell in first_of_cell:
+                union(first_of_cell[cell], process)
+            else:
+                first_of_cell[cell] = process
+    else:
+        order = _topological_order(processes, vsm_instance.links)
+        size = math.ceil(len(order) / n_partitions) if order else 1
+        for start in range(0, len(order), size):
+            for process in order[start + 1:start + size]:
+                union(order[start], process)
+
+    children: dict[Process, list[Process]] = {}
+    for link_parent, child in vsm_instance.links:
+        children.setdefault(link_parent, []).append(child)
+    for process in processes:
+        if not isinstance(process, Facory_Process):
+            continue
+        for produit, quantite in process.get_nomenclature().items():
+            if quantite <= 0:
+                continue
+            receivers = [child for child in children.get(process, []) if Simulation._accepts(child, produit)]
+            if len(receivers) > 1:
+                for child in receivers:
+                    union(process, child)
+    for link in vsm_instance.links:
+        if getattr(link, "capacity", None) is not None:
+            union(link.parent, link.child)
+    for loop in getattr(vsm_instance, "conwip_loops", []):
+        for process in loop.processes[1:]:
+            union(loop.processes[0], process)
+
+    while True:
+        roots = list(dict.fromkeys(find(process) for process in processes))
+        edges: dict = {}
+        for link_parent, child in vsm_instance.links:
+            a, b = find(link_parent), find(child)
+            if a is not b:
+                edges.setdefault(a, set()).add(b)
+        merged = False
+        for component in _strongly_connected(roots, edges):
+            for other in component[1:]:
+                union(component[0], other)
+                merged = True
+        if not merged:
+            break
+
+    groups: dict[Process, list[Process]] = {}
+    for process in processes:
+        groups.setdefault(find(process), []).append(process)
+    rank = {process: index for index, process in enumerate(_topological_order(processes, vsm_instance.links))}
+    position = {root: min(rank[member] for member in members) for root, members in groups.items()}
+    # Ordre topologique des partitions (le graphe des partitions est acyclique).
+    indegree = {root: 0 for root in groups}
+    for root, successors in edges.items():
+        for successor in successors:
+            indegree[successor] += 1
+    ready = sorted((root for root in groups if indegree[root] == 0), key=position.get)
+    ordered = []
+    while ready:
+        root = ready.pop(0)
+        ordered.append(groups[root])
+        for successor in sorted(edges.get(root, ()), key=position.get):
+            indegree[successor] -= 1
+            if indegree[successor] == 0:
+                ready.append(successor)
+        ready.sort(key=position.get)
+    return ordered
+
+
+def _product_keys(processes: list[Process]) -> dict:
+    """
+    Clé entière de chaque produit, dans l'ordre des nomenclatures de la VSM : les produits
+    sont ainsi retrouvés dans la copie de la VSM de chaque worker.
+    """
+    keys = {}
+    for process in processes:
+        for produit in getattr(process, "nomenclature", {}):
+            keys.setdefault(produit, len(keys))
+    return keys
+
+
+class _PartitionSimulation(Simulation):
+    """Simulation d'une partition : les envois hors partition sont regroupés par événement."""
+
+    def __init__(self, vsm_instance, seed, members: set, owner: dict, product_keys: dict):
+        super().__init__(vsm_instance, seed=seed, partition=members)
+        self._owner = owner                     # process -> numéro de partition
+        self._position = {process: index for index, process in enumerate(vsm_instance.process_list)}
+        self._product_keys = product_keys       # produit -> clé entière
+        self._products = {key: produit for produit, key in product_keys.items()}
+        self._outbox: dict[int, list] = {}
+        self.sent: list = []                    # [(partition, date, rang émetteur, livraisons)]
+
+    def _send_remote(self, station: _Station, target: Process, produit, quantite: int) -> None:
+        self._outbox.setdefault(self._owner[target], []).append(
+            (self._position[target], self._product_keys[produit], quantite))
+
+    def _finish(self, item) -> None:
+        if type(item) is _Arrival:
+            self._arrive(item)
+            return
+        super()._finish(item)
+        if self._outbox:
+            for partition, deliveries in self._outbox.items():
+                self.sent.append((partition, self.now, item.index, deliveries))
+            self._outbox = {}
+
+    def receive(self, when: float, sender_index: int, deliveries: list) -> None:
+        self._seq += 1
+        heapq.heappush(self._queue, (when, sender_index, self._seq, _Arrival(deliveries)))
+
+    def _arrive(self, arrival: _Arrival) -> None:
+        self.events -= 1    # seul l'événement de fin chez l'émetteur est compté
+        processes = self.vsm.process_list
+        woken = []
+        for target_index, product_key, quantite in arrival.deliveries:
+            target = processes[target_index]
+            produit = self._products[product_key]
+            receiver = self._stations.get(target)
+            if receiver is not None:
+                target.add(produit, quantite)
+                woken.append(receiver)
+                buffer = self._buffers.get((target, produit))
+                if buffer is not None:
+                    for loop in buffer.loops:
+                        self._move_loop(loop, quantite)
+            else:
+                target.add_product(produit)
+                target.add(produit, quantite)
+                self.throughput[produit] = self.throughput.get(produit, 0) + quantite
+        for receiver in woken:
+            self._try_start(receiver)
+        self._release()
+
+
+def _lookahead(members: list[Process]) -> float:
+    """Plus petit temps de process garanti (0 dès qu'un temps est aléatoire, le tirage pouvant être nul)."""
+    bound = math.inf
+    for process in members:
+        if isinstance(process, Facory_Process):
+            bound = min(bound, process.get_process_time() if process.time_variability == 0 else 0.0)
+    return max(bound, 0.0)
+
+
+def _run_partition(vsm_instance, number: int, partitions_index: list[list[int]], seed, until: float,
+                   window: float, inbox, outboxes: dict, upstream: list[int], results) -> None:
+    processes = vsm_instance.process_list
+    members = {processes[index] for index in partitions_index[number]}
+    owner = {processes[index]: part for part, indexes in enumerate(partitions_index) for index in indexes}
+    product_keys = _product_keys(processes)
+    simulation = _PartitionSimulation(vsm_instance, seed, members, owner, product_keys)
+    lookahead = _lookahead(list(members))
+    bounds = {part: 0.0 for part in upstream}
+    done_until = 0.0
+    published: dict[int, float] = {}
+    while True:
+        safe = min(bounds.values(), default=math.inf)
+        target = min(safe, done_until + window)
+        final = target > until
+        if final:
+            simulation._advance(until)
+        else:
+            simulation._advance(target, inclusive=False)
+            done_until = target
+        for part, when, sender_index, deliveries in simulation.sent:
+            outboxes[part].put(("msg", when, sender_index, deliveries))
+        simulation.sent.clear()
+        bound = math.inf if final else min(simulation.next_time(), target + lookahead)
+        for part, outbox in outboxes.items():
+            if published.get(part) != bound:
+                outbox.put(("bound", number, bound))
+                published[part] = bound
+        if final:
+            break
+        block = target >= safe
+        while True:
+            try:
+                message = inbox.get(block=block)
+            except queue.Empty:
+                break
+            block = False
+            if message[0] == "msg":
+                simulation.receive(message[1], message[2], message[3])
+            else:
+                bounds[message[1]] = message[2]
+    simulation._close(until)
+    stations = {station.index: (station.crafts, station.busy_time) for station in simulation._stations.values()}
+    throughput = {product_keys[produit]: qte for produit, qte in simulation.throughput.items()}
+    inventories = {index: {product_keys[produit]: qte for produit, qte in processes[index].get_products().items()
+                           if produit in product_keys}
+                   for index in partitions_index[number]}
+    results.put((number, simulation.events, stations, throughput, inventories))
+
+
+def _partition_worker(*args) -> None:
+    """Point d'entrée d'un worker : une exception est renvoyée au parent au lieu de le laisser attendre."""
+    number, results = args[1], args[-1]
+    try:
+        _run_partition(*args)
+    except BaseException as error:
+        try:
+            pickle.dumps(error)
+        except Exception:
+            error = RuntimeError(f"{type(error).__name__}: {error}")
+        results.put(("error", number, error))
+
+
+class ParallelSimulation:
+    """
+    Simulation d'une VSM découpée en partitions, chacune dans un worker.
+
+    Args:
+        vsm_instance: VSM à simuler.
+        partitions (Optional[list[list[Process]]]): Découpage (voir `partition_vsm`) ; par défaut
+                                                    `partition_vsm(vsm_instance, workers)`.
+        seed (Optional[int]): Graine, identique à celle de `Simulation` pour des résultats identiques.
+        workers (int): Nombre de partitions visé si `partitions` n'est pas fourni.
+        window (Optional[float]): Avance maximale (en temps simulé) entre deux publications de
+                                  bornes : plus elle est petite, plus les partitions en aval
+                                  démarrent tôt. Par défaut until / 64.
+        backend (str): "process" (un processus par partition) ou "inline" (partitions simulées
+                       à la suite dans le processus courant, utile pour déboguer).
+
+    Les stocks finaux des partitions sont recopiés dans les process de la VSM, comme après `Simulation.run`.
+    """
+
+    BACKENDS = ["process", "inline"]
+
+    def __init__(self, vsm_instance, partitions: Optional[list[list[Process]]] = None, seed: Optional[int] = None,
+                 workers: int = 2, window: Optional[float] = None, backend: str = "process"):
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Le backend '{backend}' n'est pas valide. Choisissez parmi {self.BACKENDS}.")
+        if window is not None and window <= 0:
+            raise ValueError("window doit être strictement positif.")
+        self.vsm = vsm_instance
+        self.partitions = partitions if partitions is not None else partition_vsm(vsm_instance, workers)
+        self.seed = seed
+        self.window = window
+        self.backend = backend
+        position = {process: index for index, process in enumerate(vsm_instance.process_list)}
+        self._partitions_index = [[position[process] for process in members] for members in self.partitions]
+        if sorted(index for indexes in self._partitions_index for index in indexes) != list(range(len(position))):
+            raise ValueError("Chaque process de la VSM doit appartenir à exactement une partition.")
+        owner = {process: part for part, members in enumerate(self.partitions) for process in members}
+        for link in vsm_instance.links:
+            if getattr(link, "capacity", None) is not None and owner[link.parent] != owner[link.child]:
+                raise ValueError(f"La liaison bornée {link.parent.get_name()} -> {link.child.get_name()} "
+                                 "ne peut pas relier deux partitions.")
+        for loop in getattr(vsm_instance, "conwip_loops", []):
+            if len({owner[process] for process in loop.processes}) > 1:
+                raise ValueError("Une boucle CONWIP ne peut pas être répartie sur plusieurs partitions.")
+
+    def _topology(self) -> tuple[list[list[int]], list[set[int]]]:
+        owner = {index: part for part, indexes in enumerate(self._partitions_index) for index in indexes}
+        position = {process: index for index, process in enumerate(self.vsm.process_list)}
+        upstream = [set() for _ in self._partitions_index]
+        downstream = [set() for _ in self._partitions_index]
+        for parent, child in self.vsm.links:
+            a, b = owner[position[parent]], owner[position[child]]
+            if a != b:
+                upstream[b].add(a)
+                downstream[a].add(b)
+        return [sorted(parts) for parts in upstream], downstream
+
+    def run(self, until: float) -> dict:
+        """Simule jusqu'à `until` et retourne les résultats au même format que `Simulation.run`."""
+        upstream, downstream = self._topology()
+        count = len(self._partitions_index)
+        window = self.window if self.window is not None else max(until / 64, 1e-9)
+        if self.backend == "inline":
+            inboxes = [queue.Queue() for _ in range(count)]
+            results = queue.Queue()
+            for number in range(count):
+                # Les partitions sont en ordre topologique : l'amont est terminé avant l'aval.
+                _run_partition(self.vsm, number, self._partitions_index, self.seed, until, window,
+                               inboxes[number], {part: inboxes[part] for part in downstream[number]},
+                               upstream[number], results)
+            collected = [results.get() for _ in range(count)]
+        else:
+            context = multiprocessing.get_context("fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn")
+            inboxes = [context.Queue() for _ in range(count)]
+            results = context.Queue()
+            workers = [context.Process(target=_partition_worker,
+                                       args=(self.vsm, number, self._partitions_index, self.seed, until, window,
+                                             inboxes[number], {part: inboxes[part] for part in downstream[number]},
+                                             upstream[number], results))
+                       for number in range(count)]
+            for worker in workers:
+                worker.start()
+            try:
+                collected = self._collect(results, workers, count)
+            finally:
+                for worker in workers:
+                    if worker.is_alive():
+                        worker.terminate()
+                    worker.join()
+        return self._merge(collected, until)
+
+    @staticmethod
+    def _collect(results, workers: list, count: int, poll: float = 0.1) -> list:
+        """
+        Résultats des workers. Lève l'exception d'un worker, ou RuntimeError si un worker
+        s'arrête sans résultat, au lieu d'attendre indéfiniment.
+        """
+        collected = []
+        while len(collected) < count:
+            try:
+                message = results.get(timeout=poll)
+            except queue.Empty:
+                stopped = [worker for worker in workers if worker.exitcode not in (None, 0)]
+                if not stopped and not all(worker.exitcode is not None for worker in workers):
+                    continue
+                try:
+                    # Un résultat peut encore être en transit après la fin du worker.
+                    message = results.get(timeout=1.0)
+                except queue.Empty:
+                    codes = ", ".join(str(worker.exitcode) for worker in workers)
+                    raise RuntimeError(f"Un worker s'est arrêté sans résultat (codes de sortie : {codes}).")
+            if message[0] == "error":
+                raise message[2]
+            collected.append(message)
+        return collected
+
+    def _merge(self, collected: list, until: float) -> dict:
+        processes = self.vsm.process_list
+        products = {key: produit for produit, key in _product_keys(processes).items()}
+        events, stations, throughput = 0, {}, {}
+        for _, partition_events, partition_stations, partition_throughput, inventories in collected:
+            events += partition_events
+            stations.update(partition_stations)
+            for key, qte in partition_throughput.items():
+                throughput[products[key]] = throughput.get(products[key], 0) + qte
+            for index, inventory in inventories.items():
+                for key, qte in inventory.items():
+                    processes[index].add_product(products[key])
+                    processes[index].inventaire_bdl[products[key]] = qte
+        return {
+            "time": float(until),
+            "events": events,
+            "throughput": {str(produit): qte for produit, qte in throughput.items()},
+            "stations": {
+                processes[index].get_name(): {
+                    "crafts": crafts,
+                    "utilization": busy_time / until if until > 0 else 0.0,
+                }
+                for index, (crafts, busy_time) in sorted(stations.items())
+            },
+        }
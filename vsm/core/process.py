@@ -1,6 +1,5 @@
-from dataclasses import dataclass
-from inventory_management import Inventaire
-from product_mangement import Produit
+from .inventory_management import Inventaire
+from .product_mangement import Produit
 
 
 class Process:
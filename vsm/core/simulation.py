@@ -0,0 +1,671 @@
+"""
+Module: simulation
+Description: Boucle de simulation à événements discrets d'une VSM.
+             Chaque Facory_Process est une station : dès qu'elle est libre et que
+             `can_process` est vrai, elle lance `_craft_produit` (consommation des entrées,
+             tirage du temps de process). À la fin du temps de process, les produits fabriqués
+             sont envoyés aux process enfants (vsm.links) qui les consomment, ou à un Process
+             de stockage. Un produit qu'aucun enfant n'accepte reste dans la station et
+             compte comme produit fini. Les liaisons peuvent borner le stock de l'enfant,
+             imposer un lot de transfert et un temps de transport (voir link.Link).
+"""
+
+import heapq
+import math
+import time
+from typing import Optional
+import numpy as np
+from .process import Process
+from .factory_process import Facory_Process
+from .instrumentation import Instrumentation
+from .link import RingBuffer
+
+
+class _Station:
+    """État d'un Facory_Process pendant la simulation."""
+    __slots__ = ("index", "process", "can_process", "craft", "routes", "busy", "started_at",
+                 "busy_time", "crafts", "starved_since", "stats", "bounded", "blocked", "blocked_since",
+                 "feeders", "gates", "loops", "loop_moves")
+
+    def __init__(self, index: int, process: Facory_Process):
+        self.index = index
+        self.process = process
+        self.can_process = process.can_process
+        self.craft = process._craft_produit
+        self.routes: list = []     # [(produit, quantité par craft, [_Channel vers les receveurs])]
+        self.busy = False
+        self.started_at = 0.0
+        self.busy_time = 0.0
+        self.crafts = 0
+        self.starved_since: Optional[float] = None
+        self.stats = None
+        self.bounded = False       # au moins une sortie vers un stock tampon borné
+        self.blocked = False       # un lot complet attend de la place en aval
+        self.blocked_since = 0.0
+        self.feeders: list = []    # canaux bornés qui alimentent la station
+        self.gates: list = []      # boucles CONWIP dont la station est une entrée
+        self.loops: list = []      # boucles CONWIP dont la station est membre
+        self.loop_moves: list = [] # [(boucle, variation de son en-cours à chaque craft)]
+
+
+class _Buffer:
+    """Stock d'entrée d'un process pour un produit : quantité en stock et en transport vers lui."""
+    __slots__ = ("target", "produit", "in_transit", "loops")
+
+    def __init__(self, target: Process, produit):
+        self.target = target
+        self.produit = produit
+        self.in_transit = 0
+        self.loops: list = []      # boucles CONWIP dont l'en-cours compte ce stock
+
+    def level(self) -> int:
+        return self.target.get_quantity(self.produit) + self.in_transit
+
+
+class _Channel:
+    """Flux d'un produit sur une liaison. Ordonné dans l'échéancier au rang de l'émetteur."""
+    __slots__ = ("index", "source", "target", "produit", "buffer", "capacity", "batch", "delay", "transit",
+                 "plain", "receiver", "loops")
+
+    def __init__(self, source: _Station, link, produit, buffer: _Buffer):
+        self.index = source.index
+        self.source = source
+        self.target = buffer.target
+        self.produit = produit
+        self.buffer = buffer
+        self.capacity: Optional[int] = getattr(link, "capacity", None)
+        self.batch: int = getattr(link, "transfer_batch", 1)
+        self.delay: float = getattr(link, "transport_time", 0.0)
+        # Au plus capacity / lot envois en transport sur une liaison bornée.
+        self.transit = RingBuffer(self.capacity // self.batch if self.capacity else 8) if self.delay > 0 else None
+        self.plain = self.capacity is None and self.batch == 1 and self.delay <= 0
+        self.receiver: Optional[_Station] = None    # station receveuse si elle est simulée
+        self.loops: list = []                       # [(boucle, variation de son en-cours par unité envoyée)]
+
+
+class _Loop:
+    """
+    Boucle CONWIP pendant la simulation. `wip` est tenu à jour à chaque craft et à chaque
+    envoi, `level()` ne sert qu'à l'initialiser.
+    """
+    __slots__ = ("limit", "wip", "entries", "outputs", "buffers")
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.wip = 0
+        self.entries: list[_Station] = []
+        self.outputs: list = []    # [(process, produit)] fabriqués par la boucle, en attente d'envoi
+        self.buffers: list = []    # stocks d'entrée alimentés par la boucle
+
+    def level(self) -> int:
+        total = sum(process.get_quantity(produit) for process, produit in self.outputs)
+        return total + sum(buffer.level() for buffer in self.buffers)
+
+
+class FlowTracker:
+    """
+    Temps de séjour de la matière dans chaque stock d'une simulation (voir `Simulation.track_flows`).
+
+    Un stock est un couple (station, produit) : stock d'entrée (matière reçue ou en transport
+    vers la station, jusqu'à sa consommation) ou stock de sortie (produit fabriqué, du début du
+    craft à son envoi, ou à la fin du craft pour un produit fini). Pour chaque stock, l'aire
+    ∫ niveau dt et la quantité sortie sont tenues exactement à chaque mouvement ; leur rapport
+    est le temps de séjour moyen (loi de Little appliquée stock par stock).
+
+    Le lead time d'un produit est le plus long chemin de la nomenclature : temps de séjour en
+    sortie de son fabricant, plus le plus long des lead times de ses entrées augmentés de leur
+    séjour en entrée. Un assemblage de k branches en parallèle ne compte donc pas k fois.
+    """
+
+    def __init__(self, simulation: "Simulation"):
+        self.level: list[float] = []
+        self.since: list[float] = []
+        self.area: list[float] = []
+        self.out: list[float] = []
+        self._slots: dict = {}
+        self._started: dict[_Station, list] = {}    # station -> [(stock, mouvement au début d'un craft)]
+        self._done: dict[_Station, list] = {}       # station -> [(stock de produit fini, quantité)]
+        self._shipped: dict[_Channel, tuple] = {}   # canal -> (stock de sortie, stock d'entrée ou None)
+        self._makers: dict = {}                     # produit -> [([(entrée, stock)], stock de sortie)]
+        self._final: dict = {}                      # produit fini -> [stocks de sortie]
+        now = simulation.now
+        for station in simulation._stations.values():
+            process = station.process
+            moves, inputs = [], []
+            for produit, quantite in process.get_nomenclature().items():
+                if quantite < 0:
+                    buffer = simulation._buffers.get((process, produit))
+                    level = buffer.level() if buffer is not None else process.get_quantity(produit)
+                    slot = self._slot((process, produit, "in"), level, now)
+                    moves.append((slot, quantite))
+                    inputs.append((produit, slot))
+            for produit, quantite, channels in station.routes:
+                if channels:
+                    level = process.get_quantity(produit)
+                else:
+                    level = quantite if station.busy else 0
+                slot = self._slot((process, produit, "out"), level, now)
+                moves.append((slot, quantite))
+                self._makers.setdefault(produit, []).append((inputs, slot))
+                if not channels:
+                    self._done.setdefault(station, []).append((slot, quantite))
+                if not channels or any(channel.receiver is None for channel in channels):
+                    self._final.setdefault(produit, []).append(slot)
+                for channel in channels:
+                    target = None
+                    if channel.receiver is not None:
+                        target = self._slot((channel.target, produit, "in"), channel.buffer.level(), now)
+                    self._shipped[channel] = (slot, target)
+            self._started[station] = moves
+        self._order = self._topological_order()
+
+    def _slot(self, key, level: float, now: float) -> int:
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = self._slots[key] = len(self.level)
+            self.level.append(float(level))
+            self.since.append(now)
+            self.area.append(0.0)
+            self.out.append(0.0)
+        return slot
+
+    def _topological_order(self) -> list:
+        """Produits des entrées vers les sorties ; les produits d'un cycle sont placés à la fin."""
+        successors: dict = {}
+        pending: dict = {}
+        for produit, makers in self._makers.items():
+            pending.setdefault(produit, 0)
+            for inputs, _ in makers:
+                for entree, _ in inputs:
+                    pending.setdefault(entree, 0)
+                    successors.setdefault(entree, []).append(produit)
+                    pending[produit] += 1
+        order = [produit for produit, count in pending.items() if count == 0]
+        for produit in order:
+            for successor in successors.get(produit, []):
+                pending[successor] -= 1
+                if pending[successor] == 0:
+                    order.append(successor)
+        placed = set(order)
+        return order + [produit for produit in pending if produit not in placed]
+
+    def move(self, slot: int, delta: float, now: float) -> None:
+        self.area[slot] += self.level[slot] * (now - self.since[slot])
+        self.since[slot] = now
+        self.level[slot] += delta
+        if delta < 0:
+            self.out[slot] -= delta
+
+    def started(self, station: _Station, now: float) -> None:
+        for slot, delta in self._started[station]:
+            self.move(slot, delta, now)
+
+    def finished(self, station: _Station, now: float) -> None:
+        for slot, quantite in self._done.get(station, ()):
+            self.move(slot, -quantite, now)
+
+    def shipped(self, channel: _Channel, quantite: int, now: float) -> None:
+        source, target = self._shipped[channel]
+        self.move(source, -quantite, now)
+        if target is not None:
+            self.move(target, quantite, now)
+
+    def take(self, now: float) -> tuple[np.ndarray, np.ndarray]:
+        """Aires et quantités sorties de chaque stock depuis le dernier appel ; remet les compteurs à zéro."""
+        for slot in range(len(self.level)):
+            self.move(slot, 0, now)
+        area, out = np.array(self.area), np.array(self.out)
+        self.area = [0.0] * len(area)
+        self.out = [0.0] * len(out)
+        return area, out
+
+    def lead_time(self, area: np.ndarray, out: np.ndarray) -> float:
+        """
+        Lead time des produits finis pour des aires et quantités sorties cumulées (voir `take`),
+        moyenné selon les quantités de chaque produit fini sorties.
+        """
+        stay = np.divide(area, out, out=np.zeros(len(area)), where=out > 0)
+        lead: dict = {}
+        for produit in self._order:
+            best = 0.0
+            for inputs, slot in self._makers.get(produit, ()):
+                upstream = max((lead.get(entree, 0.0) + stay[entree_slot] for entree, entree_slot in inputs),
+                               default=0.0)
+                best = max(best, upstream + stay[slot])
+            lead[produit] = best
+        if not self._final:
+            return math.nan
+        leads = np.array([lead[produit] for produit in self._final])
+        weights = np.array([sum(out[slot] for slot in slots) for slots in self._final.values()])
+        if weights.sum() <= 0:
+            return float(leads.mean())
+        return float(np.dot(leads, weights) / weights.sum())
+
+
+class Simulation:
+    """
+    Simulation à événements discrets d'une instance de `vsm`.
+
+    Args:
+        vsm_instance: VSM à simuler (process_list + links).
+        seed (Optional[int]): Si fourni, chaque Facory_Process reçoit son propre générateur,
+                              dérivé de (seed, position dans process_list).
+        instrumentation (Optional[Instrumentation]): Compteurs (désactivés par défaut).
+        partition (Optional[set[Process]]): Ne simule que ces process ; les envois vers les
+                                            autres process passent par `_send_remote`.
+
+    Les événements sont ordonnés par (date, position du process dans process_list) : l'ordre
+    des événements simultanés ne dépend donc pas de l'historique, ce qui permet de rejouer
+    exactement une partie de la VSM (voir parallel_simulation).
+
+    Les liaisons (`Link`) peuvent borner le stock d'entrée de l'enfant : une station dont un
+    lot complet ne trouve pas de place est bloquée (blocage après service) jusqu'à ce que
+    l'aval consomme. Les lots de transfert attendent d'être complets chez le parent, et la
+    matière en transport est gardée dans une `RingBuffer` par liaison, avec un seul
+    événement en attente par liaison. Les boucles CONWIP (`vsm.conwip_loops`) retiennent
+    leurs stations d'entrée tant que leur en-cours atteint la limite.
+    """
+
+    def __init__(self, vsm_instance, seed: Optional[int] = None,
+                 instrumentation: Optional[Instrumentation] = None,
+                 partition: Optional[set[Process]] = None):
+        self.vsm = vsm_instance
+        self.seed = seed
+        self.instrumentation = instrumentation if instrumentation is not None else Instrumentation()
+        self.now = 0.0
+        self.events = 0
+        self.throughput: dict = {}
+        self._queue: list = []
+        self._seq = 0
+        self._started = False
+        self._stations: dict[Process, _Station] = {}
+        self._remote: set[Process] = set()
+        self._buffers: dict = {}   # (process, produit) -> _Buffer
+        self._retry: list[_Station] = []
+        self._loops: list[_Loop] = []
+        self._flows: Optional[FlowTracker] = None
+
+        for index, process in enumerate(vsm_instance.process_list):
+            if partition is not None and process not in partition:
+                self._remote.add(process)
+                continue
+            if not isinstance(process, Facory_Process):
+                continue
+            # Sans graine, on revient à np.random même si une simulation précédente en a fixé une.
+            process.rng = np.random.default_rng([seed, index]) if seed is not None else None
+            self.instrumentation.attach(process)
+            station = _Station(index, process)
+            station.stats = process.stats
+            station.can_process, station.craft = self.instrumentation.wrap(process)
+            self._stations[process] = station
+
+        children: dict[Process, list] = {}
+        for link in vsm_instance.links:
+            parent, _ = link
+            children.setdefault(parent, []).append(link)
+
+        for process, station in self._stations.items():
+            sources_only = True
+            for produit, quantite in process.get_nomenclature().items():
+                if quantite < 0:
+                    sources_only = False
+                    continue
+                channels = []
+                for link in children.get(process, []):
+                    _, child = link
+                    if not self._accepts(child, produit):
+                        continue
+                    if child not in self._stations and child not in self._remote:
+                        child.add_product(produit)
+                    buffer = self._buffers.get((child, produit))
+                    if buffer is None:
+                        buffer = self._buffers[(child, produit)] = _Buffer(child, produit)
+                    channel = _Channel(station, link, produit, buffer)
+                    channel.receiver = self._stations.get(child)
+                    if channel.receiver is None and child not in self._remote:
+                        # Un Process de stockage ne consomme jamais : une capacité bloquerait
+                        # l'émetteur pour toujours.
+                        channel.capacity = None
+                        channel.plain = channel.batch == 1 and channel.delay <= 0
+                    channels.append(channel)
+                    if channel.capacity is not None and channel.receiver is not None:
+                        need = -child.get_nomenclature()[produit]
+                        if channel.capacity < need:
+                            raise ValueError(f"La capacité de la liaison {process.get_name()} -> {child.get_name()} "
+                                             f"({channel.capacity}) est inférieure à la consommation d'un craft ({need}).")
+                    if channel.capacity is not None:
+                        station.bounded = True
+                        if child in self._stations:
+                            self._stations[child].feeders.append(channel)
+                station.routes.append((produit, quantite, channels))
+            if sources_only and process.get_process_time() <= 0:
+                raise ValueError(f"Le process source {process.get_name()} doit avoir un process_time strictement positif.")
+
+        for loop in getattr(vsm_instance, "conwip_loops", []):
+            self._add_loop(loop)
+        if self._loops:
+            self._index_loops()
+
+    def _add_loop(self, loop) -> None:
+        members = [self._stations[process] for process in loop.processes if process in self._stations]
+        if not members:
+            return
+        inside = {station.process for station in members}
+        runtime = _Loop(loop.limit)
+        fed = set()
+        for station in members:
+            for produit, _, channels in station.routes:
+                if channels:
+                    runtime.outputs.append((station.process, produit))
+                for channel in channels:
+                    if channel.target in inside and channel.buffer not in runtime.buffers:
+                        runtime.buffers.append(channel.buffer)
+                        fed.add(channel.target)
+        runtime.entries = [station for station in members if station.process not in fed]
+        if not runtime.entries:
+            raise ValueError("Une boucle CONWIP doit avoir au moins un process d'entrée (sans alimentation interne).")
+        for station in runtime.entries:
+            station.gates.append(runtime)
+        for station in members:
+            station.loops.append(runtime)
+        for buffer in runtime.buffers:
+            buffer.loops.append(runtime)
+        self._loops.append(runtime)
+
+    def _index_loops(self) -> None:
+        """Précalcule la variation de l'en-cours des boucles à chaque craft et à chaque envoi."""
+        for station in self._stations.values():
+            moves: dict = {}
+            for loop in station.loops:
+                for _, quantite, channels in station.routes:
+                    if channels:
+                        moves[loop] = moves.get(loop, 0) + quantite
+            for produit, quantite in station.process.get_nomenclature().items():
+                buffer = self._buffers.get((station.process, produit))
+                if quantite < 0 and buffer is not None:
+                    for loop in buffer.loops:
+                        moves[loop] = moves.get(loop, 0) + quantite
+            station.loop_moves = [(loop, delta) for loop, delta in moves.items() if delta]
+            for _, _, channels in station.routes:
+                for channel in channels:
+                    shifts = {loop: -1 for loop in station.loops}
+                    for loop in channel.buffer.loops:
+                        shifts[loop] = shifts.get(loop, 0) + 1
+                    channel.loops = [(loop, shift) for loop, shift in shifts.items() if shift]
+
+    def _move_loop(self, loop: _Loop, delta: int) -> None:
+        before = loop.wip
+        loop.wip += delta
+        if before >= loop.limit > loop.wip:
+            # La boucle repasse sous sa limite : ses entrées peuvent relancer un craft.
+            self._retry.extend(loop.entries)
+
+    @staticmethod
+    def _accepts(child: Process, produit) -> bool:
+        if isinstance(child, Facory_Process):
+            return child.get_nomenclature().get(produit, 0) < 0
+        return True
+
+    def _schedule(self, when: float, item) -> None:
+        self._seq += 1
+        heapq.heappush(self._queue, (when, item.index, self._seq, item))
+
+    def _try_start(self, station: _Station) -> None:
+        if station.busy or station.blocked:
+            return
+        if station.gates:
+            for loop in station.gates:
+                if loop.wip >= loop.limit:
+                    if station.starved_since is None:
+                        station.starved_since = self.now
+                    return
+        if not station.can_process():
+            if station.starved_since is None:
+                station.starved_since = self.now
+            return
+        if station.starved_since is not None:
+            if station.stats is not None:
+                station.stats.starved_time += self.now - station.starved_since
+            station.starved_since = None
+        duration = max(0.0, station.craft())
+        station.busy = True
+        station.started_at = self.now
+        station.crafts += 1
+        if station.stats is not None:
+            station.stats.crafts += 1
+        if self._flows is not None:
+            self._flows.started(station, self.now)
+        self._schedule(self.now + duration, station)
+        # La consommation libère de la place pour les émetteurs bloqués et l'en-cours des boucles.
+        if station.feeders:
+            for channel in station.feeders:
+                if channel.source.blocked:
+                    self._retry.append(channel.source)
+        if station.loop_moves:
+            for loop, delta in station.loop_moves:
+                self._move_loop(loop, delta)
+
+    def _finish(self, item) -> None:
+        if type(item) is _Channel:
+            self._transported(item)
+            self._release()
+            return
+        station = item
+        station.busy = False
+        station.busy_time += self.now - station.started_at
+        process = station.process
+        if self._flows is not None:
+            self._flows.finished(station, self.now)
+        woken = []
+        for produit, quantite, channels in station.routes:
+            if not channels:
+                self.throughput[produit] = self.throughput.get(produit, 0) + quantite
+                continue
+            if len(channels) == 1 and channels[0].plain:
+                # Liaison simple : tout le stock part immédiatement.
+                available = process.get_quantity(produit)
+                if available:
+                    process.remove(produit, available)
+                    if self._flows is not None:
+                        self._flows.shipped(channels[0], available, self.now)
+                    if channels[0].loops:
+                        for loop, shift in channels[0].loops:
+                            self._move_loop(loop, shift * available)
+                    receiver = channels[0].receiver
+                    if receiver is not None:
+                        receiver.process.add(produit, available)
+                        woken.append(receiver)
+                    else:
+                        self._deliver(channels[0], available, woken)
+                continue
+            self._ship(station, produit, channels, woken)
+        if station.bounded and self._is_blocked(station):
+            station.blocked = True
+            station.blocked_since = self.now
+        for receiver in woken:
+            self._try_start(receiver)
+        self._try_start(station)
+        if self._retry:
+            self._release()
+
+    def _ship(self, station: _Station, produit, channels: list, woken: list) -> None:
+        """Envoie le stock de sortie `produit` de la station, par lots complets, là où il y a de la place."""
+        process = station.process
+        available = process.get_quantity(produit)
+        if not available:
+            return
+        if len(channels) > 1:
+            # Le receveur le moins approvisionné d'abord.
+            channels = sorted(channels, key=lambda channel: channel.buffer.level())
+        for channel in channels:
+            quantite = available
+            if channel.capacity is not None:
+                quantite = min(quantite, channel.capacity - channel.buffer.level())
+            if channel.batch > 1:
+                quantite -= quantite % channel.batch
+            if quantite <= 0:
+                continue
+            process.remove(produit, quantite)
+            available -= quantite
+            if self._flows is not None:
+                self._flows.shipped(channel, quantite, self.now)
+            if channel.loops:
+                for loop, shift in channel.loops:
+                    self._move_loop(loop, shift * quantite)
+            if channel.delay > 0:
+                if not channel.transit:
+                    self._schedule(self.now + channel.delay, channel)
+                channel.transit.push(self.now + channel.delay, quantite)
+                channel.buffer.in_transit += quantite
+            else:
+                self._deliver(channel, quantite, woken)
+            if not available:
+                return
+
+    def _is_blocked(self, station: _Station) -> bool:
+        for produit, _, channels in station.routes:
+            if channels and station.process.get_quantity(produit) >= min(channel.batch for channel in channels):
+                return True
+        return False
+
+    def _deliver(self, channel: _Channel, quantite: int, woken: list) -> None:
+        target, produit = channel.target, channel.produit
+        receiver = channel.receiver
+        if receiver is not None:
+            target.add(produit, quantite)
+            woken.append(receiver)
+        elif target in self._remote:
+            self._send_remote(channel.source, target, produit, quantite)
+        else:
+            target.add(produit, quantite)
+            self.throughput[produit] = self.throughput.get(produit, 0) + quantite
+
+    def _transported(self, channel: _Channel) -> None:
+        """Fin d'un transport : livre l'envoi le plus ancien de la liaison et planifie le suivant."""
+        quantite = channel.transit.pop()
+        channel.buffer.in_transit -= quantite
+        woken = []
+        self._deliver(channel, quantite, woken)
+        if channel.transit:
+            self._schedule(channel.transit.peek_time(), channel)
+        for receiver in woken:
+            self._try_start(receiver)
+
+    def _release(self) -> None:
+        """Relance les stations qui attendaient de la place en aval ou l'en-cours d'une boucle."""
+        retry = self._retry
+        while retry:
+            station = retry.pop()
+            if station.blocked:
+                woken = []
+                for produit, _, channels in station.routes:
+                    if channels:
+                        self._ship(station, produit, channels, woken)
+                if not self._is_blocked(station):
+                    station.blocked = False
+                    if station.stats is not None:
+                        station.stats.blocked_time += self.now - station.blocked_since
+                for receiver in woken:
+                    self._try_start(receiver)
+            self._try_start(station)
+
+    def _send_remote(self, station: _Station, target: Process, produit, quantite: int) -> None:
+        """Envoi vers un process hors de la partition simulée (voir parallel_simulation)."""
+        raise RuntimeError(f"{target.get_name()} n'appartient pas à la partition simulée.")
+
+    def _start(self) -> None:
+        if not self._started:
+            self._started = True
+            for loop in self._loops:
+                loop.wip = loop.level()
+            for station in self._stations.values():
+                self._try_start(station)
+            self._release()
+
+    def next_time(self) -> float:
+        """Date du prochain événement (inf si aucun)."""
+        return self._queue[0][0] if self._queue else math.inf
+
+    def _advance(self, limit: float, inclusive: bool = True) -> int:
+        """Traite les événements de date <= limit (< limit si inclusive est faux)."""
+        self._start()
+        events_before = self.events
+        queue = self._queue
+        pop = heapq.heappop
+        finish = self._finish
+        if inclusive:
+            while queue and queue[0][0] <= limit:
+                self.now, _, _, station = pop(queue)
+                self.events += 1
+                finish(station)
+        else:
+            while queue and queue[0][0] < limit:
+                self.now, _, _, station = pop(queue)
+                self.events += 1
+                finish(station)
+        return self.events - events_before
+
+    def _close(self, until: float) -> None:
+        self.now = max(self.now, until)
+        for station in self._stations.values():
+            if station.starved_since is not None and station.stats is not None:
+                station.stats.starved_time += self.now - station.starved_since
+                station.starved_since = self.now
+            if station.blocked and station.stats is not None:
+                station.stats.blocked_time += self.now - station.blocked_since
+                station.blocked_since = self.now
+
+    def run(self, until: float) -> dict:
+        """
+        Avance la simulation jusqu'à la date `until` (peut être rappelée pour continuer).
+
+        Returns:
+            dict: résultats courants (voir `results`).
+        """
+        wall_start = time.perf_counter()
+        events = self._advance(until)
+        self._close(until)
+        self.instrumentation.record_loop(events, time.perf_counter() - wall_start)
+        return self.results()
+
+    def track_flows(self) -> FlowTracker:
+        """
+        Active le suivi des temps de séjour par stock (voir `FlowTracker`) à partir de la date
+        courante, et retourne le suivi. Désactivé par défaut : il ajoute un coût à chaque craft.
+        """
+        if self._flows is None:
+            self._flows = FlowTracker(self)
+        return self._flows
+
+    def finished(self) -> float:
+        """Quantité totale de produits finis depuis le début de la simulation."""
+        return sum(self.throughput.values())
+
+    def wip(self) -> float:
+        """
+        En-cours : quantités présentes dans les stations simulées ou en transport, hors produits finis.
+
+        Les unités de tous les produits sont additionnées telles quelles : dès qu'un produit
+        fini consomme plusieurs produits intermédiaires, WIP / débit n'est pas un lead time
+        (voir `track_flows`).
+        """
+        total = 0
+        for process, station in self._stations.items():
+            finished = {produit for produit, _, channels in station.routes if not channels}
+            total += sum(qte for produit, qte in process.get_products().items() if produit not in finished)
+        return total + sum(buffer.in_transit for buffer in self._buffers.values())
+
+    def results(self) -> dict:
+        """Résultats courants : débit par produit fini, crafts et taux d'utilisation par station."""
+        return {
+            "time": self.now,
+            "events": self.events,
+            "throughput": {str(produit): qte for produit, qte in self.throughput.items()},
+            "stations": {
+                station.process.get_name(): {
+                    "crafts": station.crafts,
+                    "utilization": station.busy_time / self.now if self.now > 0 else 0.0,
+                }
+                for station in self._stations.values()
+            },
+        }
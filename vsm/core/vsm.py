@@ -1,21 +1,38 @@
-from process import Process 
-from factory_process import Facory_Process
-import graphviz  # Assurez-vous que la bibliothèque graphviz est installée
+from typing import Optional
+from .process import Process 
+from .factory_process import Facory_Process
+from .link import ConwipLoop, Link
 
 class vsm:
     def __init__(self):
         self.process_list: list[Process] = []
-        # Stocke les liaisons sous forme de tuples (parent, child)
-        self.links: list[tuple[Process, Process]] = []
+        # Stocke les liaisons (Link, qui se déballe comme un tuple (parent, child))
+        self.links: list[Link] = []
+        self.conwip_loops: list[ConwipLoop] = []
         
     def add_process(self, process: Process):
         self.process_list.append(process)
         
-    def link_processes(self, parent: Process, child: Process) -> None:
+    def link_processes(self, parent: Process, child: Process, capacity: Optional[int] = None,
+                       transfer_batch: int = 1, transport_time: float = 0.0) -> Optional[Link]:
+        """
+        Relie deux process. Voir `Link` pour la capacité du stock tampon (kanban),
+        le lot de transfert et le temps de transport ; par défaut le transfert est immédiat et illimité.
+        """
         if parent not in self.process_list or child not in self.process_list:
             print("Les deux process doivent être ajoutés avant de créer un lien.")
-        else:
-            self.links.append((parent, child))
+            return None
+        link = Link(parent, child, capacity, transfer_batch, transport_time)
+        self.links.append(link)
+        return link
+
+    def add_conwip_loop(self, processes: list[Process], limit: int) -> ConwipLoop:
+        """Plafonne l'en-cours d'un groupe de process (voir `ConwipLoop`)."""
+        if any(process not in self.process_list for process in processes):
+            raise ValueError("Les process d'une boucle CONWIP doivent appartenir à la VSM.")
+        loop = ConwipLoop(processes, limit)
+        self.conwip_loops.append(loop)
+        return loop
             
     def get_dot(self) -> str:
         # Génération d'un graph complet sous forme de chaîne au format DOT.
@@ -31,13 +48,23 @@ class vsm:
                 shape = "box"
             dot += f'    "{process.get_name()}" [label="{process.get_name()}", shape={shape}];\n'
         # Ajoute les liaisons (arêtes)
-        for parent, child in self.links:
-            dot += f'    "{parent.get_name()}" -> "{child.get_name()}";\n'
+        for link in self.links:
+            parent, child = link
+            label = []
+            if getattr(link, "capacity", None) is not None:
+                label.append(f"cap {link.capacity}")
+            if getattr(link, "transfer_batch", 1) != 1:
+                label.append(f"lot {link.transfer_batch}")
+            if getattr(link, "transport_time", 0):
+                label.append(f"t {link.transport_time}")
+            attributes = f' [label="{", ".join(label)}"]' if label else ""
+            dot += f'    "{parent.get_name()}" -> "{child.get_name()}"{attributes};\n'
         dot += "}\n"
         return dot
 
     def show_graph(self) -> None:
         """Génère et affiche le graphe en utilisant Graphviz."""
+        import graphviz  # Assurez-vous que la bibliothèque graphviz est installée
         dot_str = self.get_dot()
         graph = graphviz.Source(dot_str)
         graph.render('process_graph', view=True, format='png')
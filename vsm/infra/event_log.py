@@ -0,0 +1,553 @@
+"""
+Module: event_log
+Description: Ingestion en flux des journaux d'événements atelier (exports CSV / JSONL)
+             pour calculer les métriques réelles d'une VSM : temps de cycle, courbes
+             d'en-cours (WIP) et lead times. Les fichiers sont lus par paquets afin de
+             garder une mémoire bornée, et un mode "tail" asyncio permet de suivre un
+             fichier qui grossit.
+"""
+
+import asyncio
+import csv
+import io
+import json
+import math
+import os
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import AsyncIterator, Iterable, Iterator, Optional
+
+
+START = "start"
+STOP = "stop"
+TRANSFER = "transfer"
+
+# Libellés acceptés dans les exports pour chaque type d'événement.
+EVENT_ALIASES = {
+    "start": START, "begin": START, "debut": START,
+    "stop": STOP, "end": STOP, "fin": STOP,
+    "transfer": TRANSFER, "move": TRANSFER, "transfert": TRANSFER,
+}
+
+DEFAULT_CHUNK_SIZE = 10_000
+
+
+@dataclass
+class EventSchema:
+    """Nom des colonnes (CSV) ou des clés (JSONL) de l'export."""
+    time: str = "timestamp"
+    event: str = "event"
+    process: str = "process"
+    product: str = "product"
+    quantity: str = "quantity"
+    unit: str = "unit"
+    source: str = "from"
+    target: str = "to"
+
+
+@dataclass(slots=True)
+class Event:
+    time: float
+    kind: str
+    process: Optional[str] = None
+    product: Optional[str] = None
+    quantity: int = 1
+    unit: Optional[str] = None
+    source: Optional[str] = None
+    target: Optional[str] = None
+
+
+def parse_time(value) -> float:
+    """Convertit un horodatage (secondes ou ISO 8601) en secondes."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+def _clean(value) -> Optional[str]:
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def parse_record(record: dict, schema: EventSchema) -> Event:
+    """
+    Transforme un enregistrement brut (dict) en Event.
+
+    Raises:
+        ValueError: Si l'horodatage ou le type d'événement est invalide.
+    """
+    kind = EVENT_ALIASES.get(str(record.get(schema.event, "")).strip().lower())
+    if kind is None:
+        raise ValueError(f"Type d'événement inconnu : {record.get(schema.event)!r}.")
+    raw_time = record.get(schema.time)
+    if raw_time is None or raw_time == "":
+        raise ValueError("Événement sans horodatage.")
+    quantity = record.get(schema.quantity)
+    return Event(
+        time=parse_time(raw_time),
+        kind=kind,
+        process=_clean(record.get(schema.process)),
+        product=_clean(record.get(schema.product)),
+        quantity=int(float(quantity)) if quantity not in (None, "") else 1,
+        unit=_clean(record.get(schema.unit)),
+        source=_clean(record.get(schema.source)),
+        target=_clean(record.get(schema.target)),
+    )
+
+
+class EventLogReader:
+    """
+    Lecteur en flux d'un export CSV ou JSONL.
+
+    Les lignes sont lues une par une et regroupées en paquets de `chunk_size`
+    événements : la mémoire utilisée ne dépend pas de la taille du fichier.
+    Les lignes invalides sont comptées dans `rejected` (ou lèvent une erreur si
+    `strict` est vrai).
+    """
+
+    def __init__(self, schema: Optional[EventSchema] = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 strict: bool = False, fmt: Optional[str] = None):
+        if chunk_size <= 0:
+            raise ValueError("chunk_size doit être strictement positif.")
+        self.schema = schema or EventSchema()
+        self.chunk_size = chunk_size
+        self.strict = strict
+        self.fmt = fmt
+        self.rejected = 0
+        self._header: Optional[list[str]] = None
+
+    @staticmethod
+    def detect_format(path: str) -> str:
+        extension = os.path.splitext(path)[1].lower()
+        if extension in (".jsonl", ".ndjson", ".json"):
+            return "jsonl"
+        if extension in (".csv", ".txt"):
+            return "csv"
+        raise ValueError(f"Format d'export non reconnu pour {path}.")
+
+    def parse_line(self, line: str, fmt: str) -> Optional[Event]:
+        """Analyse une ligne complète ; retourne None pour une ligne vide, l'entête CSV ou une ligne rejetée."""
+        if not line.strip():
+            return None
+        if fmt == "jsonl":
+            return self._parse(lambda: json.loads(line))
+        row = next(csv.reader([line]))
+        if self._header is None:
+            self._header = row
+            return None
+        return self._parse(lambda: dict(zip(self._header, row)))
+
+    def _iter_records(self, stream, fmt: str) -> Iterator[Optional[Event]]:
+        if fmt == "csv":
+            rows = csv.reader(stream)
+            self._header = next(rows, None)
+            if self._header is None:
+                return
+            for row in rows:
+                if row:
+                    yield self._parse(lambda: dict(zip(self._header, row)))
+        else:
+            for line in stream:
+                if line.strip():
+                    yield self._parse(lambda: json.loads(line))
+
+    def _parse(self, load) -> Optional[Event]:
+        try:
+            return parse_record(load(), self.schema)
+        except (ValueError, TypeError, KeyError):
+            if self.strict:
+                raise
+            self.rejected += 1
+            return None
+
+    def iter_chunks(self, path: str) -> Iterator[list[Event]]:
+        """Itère sur le fichier par paquets d'événements."""
+        fmt = self.fmt or self.detect_format(path)
+        chunk: list[Event] = []
+        with open(path, "r", encoding="utf-8", newline="") as stream:
+            for event in self._iter_records(stream, fmt):
+                if event is None:
+                    continue
+                chunk.append(event)
+                if len(chunk) >= self.chunk_size:
+                    yield chunk
+                    chunk = []
+        if chunk:
+            yield chunk
+
+    def iter_events(self, path: str) -> Iterator[Event]:
+        for chunk in self.iter_chunks(path):
+            yield from chunk
+
+    async def tail(self, path: str, poll_interval: float = 1.0,
+                   stop: Optional[asyncio.Event] = None, from_start: bool = True) -> AsyncIterator[list[Event]]:
+        """
+        Suit un fichier qui grossit (équivalent de `tail -f`) et produit les nouveaux
+        événements par paquets. Une ligne incomplète (sans retour chariot) est gardée
+        en attente jusqu'à la lecture suivante.
+
+        Args:
+            path (str): Fichier à suivre.
+            poll_interval (float): Délai entre deux lectures lorsque le fichier n'a pas changé.
+            stop (Optional[asyncio.Event]): Arrête le suivi une fois positionné.
+            from_start (bool): Si False, seules les lignes ajoutées après l'ouverture sont lues
+                               (l'entête CSV est tout de même lue).
+        """
+        fmt = self.fmt or self.detect_format(path)
+        self._header = None
+        pending = ""
+        with open(path, "r", encoding="utf-8", newline="") as stream:
+            if not from_start:
+                if fmt == "csv":
+                    self.parse_line(stream.readline(), fmt)
+                stream.seek(0, io.SEEK_END)
+            while stop is None or not stop.is_set():
+                data = stream.read(1 << 20)
+                if not data:
+                    await asyncio.sleep(poll_interval)
+                    continue
+                lines = (pending + data).split("\n")
+                pending = lines.pop()
+                chunk: list[Event] = []
+                for line in lines:
+                    event = self.parse_line(line, fmt)
+                    if event is None:
+                        continue
+                    chunk.append(event)
+                    if len(chunk) >= self.chunk_size:
+                        yield chunk
+                        chunk = []
+                if chunk:
+                    yield chunk
+
+
+class RunningStat:
+    """Moyenne / variance incrémentales (algorithme de Welford)."""
+    __slots__ = ("count", "mean", "_m2", "min", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def push(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    @property
+    def variance(self) -> float:
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    def to_dict(self) -> dict:
+        if not self.count:
+            return {"count": 0}
+        return {"count": self.count, "mean": self.mean, "std": self.std, "min": self.min, "max": self.max}
+
+
+@dataclass
+class _StationState:
+    processing_time: RunningStat = field(default_factory=RunningStat)
+    cycle_time: RunningStat = field(default_factory=RunningStat)
+    open_starts: dict = field(default_factory=dict)    # unité ou produit -> deque des dates de start
+    open_count: int = 0
+    last_stop: Optional[float] = None
+    wip: int = 0
+    wip_since: Optional[float] = None
+    wip_area: dict = field(default_factory=dict)
+    completed: int = 0
+
+
+class EventLogMetrics:
+    """
+    Accumulateur incrémental des métriques réelles à partir d'un flux d'événements.
+
+    - start / stop : temps de traitement (stop - start, apparié par unité si disponible,
+      sinon en FIFO) et temps de cycle (intervalle entre deux fins successives).
+    - transfer : fait évoluer le WIP des process source et destination. Un transfert
+      sans source est une entrée dans le flux, un transfert sans destination une sortie :
+      le lead time d'une unité va de sa première apparition à sa sortie.
+
+    La mémoire est bornée par le nombre d'unités en cours et de starts sans stop par station
+    (au plus `max_open_units` chacun, les plus anciens sont oubliés et comptés au-delà) et
+    par le nombre de tranches de la courbe de WIP (`wip_resolution`), pas par la taille du
+    journal.
+    Les événements sont supposés triés par horodatage.
+    """
+
+    SYSTEM = "__system__"
+
+    def __init__(self, vsm_instance=None, wip_resolution: float = 3600.0, max_open_units: int = 100_000):
+        if wip_resolution <= 0:
+            raise ValueError("wip_resolution doit être strictement positif.")
+        if max_open_units <= 0:
+            raise ValueError("max_open_units doit être strictement positif.")
+        self.wip_resolution = wip_resolution
+        self.max_open_units = max_open_units
+        self.expired_units = 0
+        self.expired_starts = 0
+        self.stations: dict[str, _StationState] = {}
+        self.lead_time = RunningStat()
+        self.throughput: dict[str, int] = {}
+        self.unknown_processes: dict[str, int] = {}
+        self.unknown_products: dict[str, int] = {}
+        self._unit_entry: dict[str, float] = {}
+        self.first_time: Optional[float] = None
+        self.last_time: Optional[float] = None
+        self.events = 0
+        self.processes = {}
+        self.products = {}
+        if vsm_instance is not None:
+            self.bind(vsm_instance)
+
+    def bind(self, vsm_instance) -> None:
+        """Associe les noms de process et de produits de l'export aux objets de la VSM."""
+        self.processes = {process.get_name(): process for process in vsm_instance.process_list}
+        self.products = {}
+        for process in vsm_instance.process_list:
+            for produit in getattr(process, "nomenclature", {}):
+                self.products[str(produit)] = produit
+                self.products[str(produit.id)] = produit
+
+    def _resolve_process(self, name: Optional[str]) -> Optional[str]:
+        if name is None or not self.processes or name in self.processes:
+            return name
+        self.unknown_processes[name] = self.unknown_processes.get(name, 0) + 1
+        return name
+
+    def _resolve_product(self, name: Optional[str]):
+        if name is None or not self.products:
+            return name
+        produit = self.products.get(name)
+        if produit is None:
+            self.unknown_products[name] = self.unknown_products.get(name, 0) + 1
+            return name
+        return produit
+
+    def _station(self, name: str) -> _StationState:
+        station = self.stations.get(name)
+        if station is None:
+            station = self.stations[name] = _StationState()
+        return station
+
+    def _integrate(self, station: _StationState, now: float) -> None:
+        # Ajoute l'aire WIP * durée depuis le dernier changement, découpée par tranche.
+        since = station.wip_since
+        station.wip_since = now
+        if since is None or station.wip == 0 or now <= since:
+            return
+        resolution = self.wip_resolution
+        while since < now:
+            bucket = int(since // resolution)
+            end = min(now, (bucket + 1) * resolution)
+            station.wip_area[bucket] = station.wip_area.get(bucket, 0.0) + station.wip * (end - since)
+            since = end
+
+    def _move_wip(self, name: str, delta: int, now: float) -> None:
+        station = self._station(name)
+        self._integrate(station, now)
+        station.wip += delta
+
+    def update(self, events: Iterable[Event]) -> None:
+        """Intègre un paquet d'événements."""
+        for event in events:
+            now = event.time
+            self.events += 1
+            if self.first_time is None:
+                self.first_time = now
+            self.last_time = now
+            if event.kind == TRANSFER:
+                self._on_transfer(event, now)
+                continue
+            name = self._resolve_process(event.process)
+            if name is None:
+                continue
+            station = self._station(name)
+            key = event.unit if event.unit is not None else event.product
+            if event.kind == START:
+                self._open(station, key, now)
+                if event.unit is not None and event.unit not in self._unit_entry:
+                    self._enter(event.unit, now)
+            else:
+                starts = station.open_starts.get(key)
+                if starts:
+                    station.processing_time.push(now - starts.popleft())
+                    station.open_count -= 1
+                    if not starts:
+                        del station.open_starts[key]
+                if station.last_stop is not None:
+                    station.cycle_time.push(now - station.last_stop)
+                station.last_stop = now
+                station.completed += 1
+
+    def _open(self, station: _StationState, key, now: float) -> None:
+        if station.open_count >= self.max_open_units:
+            # Start jamais arrêté (rebut, abandon, stop exporté sans unité) : on oublie le plus
+            # ancien start de la clé ouverte la première.
+            oldest = next(iter(station.open_starts))
+            starts = station.open_starts[oldest]
+            starts.popleft()
+            if not starts:
+                del station.open_starts[oldest]
+            station.open_count -= 1
+            self.expired_starts += 1
+        starts = station.open_starts.get(key)
+        if starts is None:
+            starts = station.open_starts[key] = deque()
+        starts.append(now)
+        station.open_count += 1
+
+    def _enter(self, unit: str, now: float) -> None:
+        if len(self._unit_entry) >= self.max_open_units:
+            # Les dicts gardent l'ordre d'insertion : on oublie l'unité entrée la première.
+            del self._unit_entry[next(iter(self._unit_entry))]
+            self.expired_units += 1
+        self._unit_entry[unit] = now
+
+    def _on_transfer(self, event: Event, now: float) -> None:
+        source = self._resolve_process(event.source)
+        target = self._resolve_process(event.target)
+        quantity = event.quantity
+        if source is not None:
+            self._move_wip(source, -quantity, now)
+        else:
+            self._move_wip(self.SYSTEM, quantity, now)
+            if event.unit is not None and event.unit not in self._unit_entry:
+                self._enter(event.unit, now)
+        if target is not None:
+            self._move_wip(target, quantity, now)
+        else:
+            self._move_wip(self.SYSTEM, -quantity, now)
+            produit = self._resolve_product(event.product)
+            key = str(produit) if produit is not None else None
+            self.throughput[key] = self.throughput.get(key, 0) + quantity
+            entry = self._unit_entry.pop(event.unit, None) if event.unit is not None else None
+            if entry is not None:
+                self.lead_time.push(now - entry)
+
+    def consume(self, chunks: Iterable[list[Event]]) -> "EventLogMetrics":
+        for chunk in chunks:
+            self.update(chunk)
+        return self
+
+    async def follow(self, chunks: AsyncIterator[list[Event]]) -> None:
+        """Consomme un flux asynchrone (ex : `EventLogReader.tail`)."""
+        async for chunk in chunks:
+            self.update(chunk)
+
+    def wip_curve(self, process: Optional[str] = None) -> list[tuple[float, float]]:
+        """
+        Courbe de WIP moyen par tranche de `wip_resolution`.
+
+        Args:
+            process (Optional[str]): Nom du process ; None pour le WIP total du flux.
+
+        Returns:
+            list[tuple[float, float]]: (début de tranche, WIP moyen sur la tranche)
+        """
+        station = self.stations.get(process if process is not None else self.SYSTEM)
+        if station is None or self.first_time is None:
+            return []
+        self._integrate(station, self.last_time)
+        resolution = self.wip_resolution
+        first = int(self.first_time // resolution)
+        last = int(self.last_time // resolution)
+        curve = []
+        for bucket in range(first, last + 1):
+            start = max(bucket * resolution, self.first_time)
+            end = min((bucket + 1) * resolution, self.last_time)
+            width = end - start
+            area = station.wip_area.get(bucket, 0.0)
+            curve.append((bucket * resolution, area / width if width > 0 else float(station.wip)))
+        return curve
+
+    def littles_law_lead_time(self) -> Optional[float]:
+        """Lead time estimé par la loi de Little (WIP moyen / débit) quand les unités ne sont pas tracées."""
+        station = self.stations.get(self.SYSTEM)
+        shipped = sum(self.throughput.values())
+        if station is None or not shipped or self.last_time == self.first_time:
+            return None
+        self._integrate(station, self.last_time)
+        duration = self.last_time - self.first_time
+        mean_wip = sum(station.wip_area.values()) / duration
+        return mean_wip / (shipped / duration)
+
+    def snapshot(self) -> dict:
+        """Métriques courantes sous forme de dict."""
+        return {
+            "events": self.events,
+            "first_time": self.first_time,
+            "last_time": self.last_time,
+            "lead_time": self.lead_time.to_dict(),
+            "throughput": dict(self.throughput),
+            "stations": {
+                name: {
+                    "processing_time": station.processing_time.to_dict(),
+                    "cycle_time": station.cycle_time.to_dict(),
+                    "completed": station.completed,
+                    "wip": station.wip,
+                }
+                for name, station in self.stations.items() if name != self.SYSTEM
+            },
+            "unknown_processes": dict(self.unknown_processes),
+            "unknown_products": dict(self.unknown_products),
+            "open_units": len(self._unit_entry),
+            "expired_units": self.expired_units,
+            "open_starts": sum(station.open_count for station in self.stations.values()),
+            "expired_starts": self.expired_starts,
+        }
+
+    def compare_with_model(self) -> dict[str, dict]:
+        """
+        Compare les temps réels aux paramètres modélisés des process de la VSM liée.
+
+        Returns:
+            dict[str, dict]: par process, temps modélisé / réel et leur écart relatif.
+        """
+        comparison = {}
+        for name, process in self.processes.items():
+            station = self.stations.get(name)
+            modelled = getattr(process, "process_time", None)
+            actual = station.processing_time if station is not None else None
+            row = {
+                "modelled_process_time": modelled,
+                "modelled_time_variability": getattr(process, "time_variability", None),
+                "actual_process_time": actual.mean if actual is not None and actual.count else None,
+                "actual_time_variability": actual.std if actual is not None and actual.count else None,
+                "actual_cycle_time": station.cycle_time.mean if station is not None and station.cycle_time.count else None,
+                "samples": actual.count if actual is not None else 0,
+            }
+            if modelled and row["actual_process_time"] is not None:
+                row["deviation"] = (row["actual_process_time"] - modelled) / modelled
+            comparison[name] = row
+        return comparison
+
+
+def compute_metrics(path: str, vsm_instance=None, schema: Optional[EventSchema] = None,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE, wip_resolution: float = 3600.0) -> EventLogMetrics:
+    """Lit un export complet en flux et retourne les métriques calculées."""
+    reader = EventLogReader(schema=schema, chunk_size=chunk_size)
+    return EventLogMetrics(vsm_instance, wip_resolution=wip_resolution).consume(reader.iter_chunks(path))
+
+
+async def follow_file(path: str, metrics: EventLogMetrics, schema: Optional[EventSchema] = None,
+                      poll_interval: float = 1.0, stop: Optional[asyncio.Event] = None) -> EventLogMetrics:
+    """Suit un export qui grossit et met `metrics` à jour au fil de l'eau."""
+    reader = EventLogReader(schema=schema)
+    await metrics.follow(reader.tail(path, poll_interval=poll_interval, stop=stop))
+    return metrics
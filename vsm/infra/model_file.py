@@ -0,0 +1,90 @@
+"""
+Module: model_file
+Description: Chargement d'une VSM décrite dans un fichier JSON :
+
+    {
+      "processes": [
+        {"name": "Source", "process_time": 1, "time_variability": 0, "quality": 1,
+         "nomenclature": {"A": 1}},
+        {"name": "M1", "process_time": 0.9, "time_variability": 0.2, "quality": 1,
+         "nomenclature": {"A": -1, "B": 1}},
+        {"name": "Stock"}
+      ],
+      "links": [{"from": "Source", "to": "M1", "capacity": 10},
+                {"from": "M1", "to": "Stock", "transfer_batch": 5, "transport_time": 2}],
+      "conwip": [{"processes": ["M1"], "limit": 20}]
+    }
+
+Un process sans `process_time` est un Process de stockage. Les produits sont désignés
+par leur nom dans les nomenclatures. Une liaison est une paire de noms, ou un objet dont
+les champs facultatifs sont ceux de `Link` (capacity, transfer_batch, transport_time) ;
+la capacité d'une liaison vers un stockage est ignorée.
+"""
+
+import json
+from ..core.factory_process import Facory_Process
+from ..core.process import Process
+from ..core.product_mangement import Produit
+from ..core.vsm import vsm
+
+
+def vsm_from_dict(data: dict) -> tuple[vsm, dict[str, Produit]]:
+    """
+    Construit la VSM décrite par `data`.
+
+    Returns:
+        tuple[vsm, dict[str, Produit]]: la VSM et ses produits par nom.
+
+    Raises:
+        ValueError: Si un nom de process est dupliqué, si un lien ou une boucle CONWIP désigne
+                    un process inconnu, ou si une nomenclature ou une liaison est refusée.
+    """
+    model = vsm()
+    products: dict[str, Produit] = {}
+    processes: dict[str, Process] = {}
+    for entry in data.get("processes", []):
+        name = entry["name"]
+        if name in processes:
+            raise ValueError(f"Le process {name} est défini plusieurs fois.")
+        if "process_time" in entry:
+            process = Facory_Process(name=name, process_time=entry["process_time"],
+                                     time_variability=entry.get("time_variability", 0),
+                                     quality=entry.get("quality", 1))
+            for product_name, qte in entry.get("nomenclature", {}).items():
+                produit = products.setdefault(product_name, Produit())
+                if not process.set_nomenclature_produit(produit, qte):
+                    raise ValueError(f"Nomenclature invalide pour {name} : {product_name}.")
+        else:
+            process = Process(name=name)
+        for product_name, qte in entry.get("inventory", {}).items():
+            produit = products.setdefault(product_name, Produit())
+            process.add_product(produit)
+            process.add(produit, qte)
+        processes[name] = process
+        model.add_process(process)
+    for entry in data.get("links", []):
+        if isinstance(entry, dict):
+            parent, child = entry["from"], entry["to"]
+            options = {key: entry[key] for key in ("capacity", "transfer_batch", "transport_time") if key in entry}
+        else:
+            (parent, child), options = entry, {}
+        if parent not in processes or child not in processes:
+            raise ValueError(f"Lien {parent} -> {child} : process inconnu.")
+        model.link_processes(processes[parent], processes[child], **options)
+    for entry in data.get("conwip", []):
+        unknown = [name for name in entry["processes"] if name not in processes]
+        if unknown:
+            raise ValueError(f"Boucle CONWIP : process inconnu(s) {', '.join(unknown)}.")
+        model.add_conwip_loop([processes[name] for name in entry["processes"]], entry["limit"])
+    return model, products
+
+
+def load_model(path: str) -> tuple[vsm, dict[str, Produit]]:
+    """Charge un fichier JSON et retourne la VSM et ses produits par nom."""
+    with open(path, "r", encoding="utf-8") as stream:
+        return vsm_from_dict(json.load(stream))
+
+
+def load_vsm(path: str) -> vsm:
+    """Charge un fichier JSON et retourne la VSM."""
+    return load_model(path)[0]